@@ -3,108 +3,275 @@ Quick admin statistics endpoint using direct SQL queries
 """
 from flask import Blueprint, request, jsonify, session
 import os
+import base64
+import binascii
+import hashlib
+import select
+import threading
+import time
+from contextlib import contextmanager
+import orjson
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2 import pool
+from psycopg2.extras import NamedTupleCursor
 
 admin_bp = Blueprint('admin_quick', __name__)
 
+# Persistent connection pool shared by all admin endpoints.
+# Created lazily so importing the module doesn't require DATABASE_URL,
+# and guarded by a lock for serverless cold starts with concurrent requests.
+_pg_pool = None
+_pg_pool_lock = threading.Lock()
+
+def _get_pool():
+    """Get or create the module-level PostgreSQL connection pool"""
+    global _pg_pool
+    if _pg_pool is None:
+        with _pg_pool_lock:
+            if _pg_pool is None:
+                _pg_pool = pool.ThreadedConnectionPool(
+                    minconn=1,
+                    maxconn=int(os.environ.get('PG_POOL_MAX', 8)),
+                    dsn=os.environ.get('DATABASE_URL')
+                )
+                _start_admin_cache_listener()
+    return _pg_pool
+
+def _execute_prepared(cursor, name, sql):
+    """Execute a named server-side prepared statement.
+
+    Statements are prepared on first use and persist for the lifetime of
+    the pooled connection, so Postgres reuses the plan across requests
+    instead of re-parsing the hot SQL every time.
+    """
+    try:
+        cursor.execute(f"EXECUTE {name}")
+    except psycopg2.errors.InvalidSqlStatementName:
+        # Not prepared on this connection yet (or lost to a rollback)
+        cursor.connection.rollback()
+        cursor.execute(f"PREPARE {name} AS {sql}")
+        cursor.execute(f"EXECUTE {name}")
+
+@contextmanager
+def get_conn():
+    """Borrow a connection from the pool and return it when done"""
+    pg_pool = _get_pool()
+    conn = pg_pool.getconn()
+    try:
+        yield conn
+    finally:
+        pg_pool.putconn(conn)
+
+# In-process TTL cache for admin checks so repeat hits within the window
+# skip the per-request DB round-trip. Admin status changes are rare, so a
+# short TTL is safe; grant_admin_privileges invalidates explicitly.
+_ADMIN_CACHE_TTL = 60  # seconds
+_admin_cache = {}  # email -> (is_admin, expires_at)
+_admin_cache_lock = threading.Lock()
+
+def _cached_admin_status(user_email):
+    """Return the cached is_admin boolean for an email, or None on miss"""
+    with _admin_cache_lock:
+        entry = _admin_cache.get(user_email)
+        if entry and entry[1] > time.monotonic():
+            return entry[0]
+        if entry:
+            del _admin_cache[user_email]
+    return None
+
+def _store_admin_status(user_email, is_admin):
+    """Cache the is_admin boolean for an email with a TTL"""
+    with _admin_cache_lock:
+        _admin_cache[user_email] = (is_admin, time.monotonic() + _ADMIN_CACHE_TTL)
+
+def _invalidate_admin_cache(user_email):
+    """Drop a cached admin check (e.g. after granting privileges)"""
+    with _admin_cache_lock:
+        _admin_cache.pop(user_email, None)
+
+# Cross-worker cache invalidation: grant_admin_privileges NOTIFYs the
+# promoted email inside its transaction, and every worker runs a
+# LISTEN loop on a dedicated connection that drops the matching cache
+# entry - so other workers don't serve a stale non-admin verdict for
+# the rest of their TTL.
+_listener_started = False
+_listener_lock = threading.Lock()
+
+def _admin_cache_listener():
+    """Background LISTEN loop invalidating admin-check cache entries"""
+    while True:
+        try:
+            conn = psycopg2.connect(os.environ.get('DATABASE_URL'))
+            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            with conn.cursor() as cursor:
+                cursor.execute("LISTEN admin_changed")
+            while True:
+                if select.select([conn], [], [], 60) != ([], [], []):
+                    conn.poll()
+                    while conn.notifies:
+                        note = conn.notifies.pop(0)
+                        if note.payload:
+                            _invalidate_admin_cache(note.payload)
+        except Exception as e:
+            print(f"Admin cache listener error: {e}")
+            time.sleep(5)
+
+def _start_admin_cache_listener():
+    """Start the LISTEN thread once per worker process"""
+    global _listener_started
+    if _listener_started:
+        return
+    with _listener_lock:
+        if not _listener_started:
+            thread = threading.Thread(
+                target=_admin_cache_listener,
+                name='admin-cache-listener',
+                daemon=True
+            )
+            thread.start()
+            _listener_started = True
+
 def check_admin_access():
     """Check if current user has admin access using existing auth system"""
     user_email = session.get('user_email')
     if not user_email:
         return False, "No user session found"
-    
-    # Use the existing models to check admin status
+
+    # Serve repeat checks from the TTL cache
+    cached = _cached_admin_status(user_email)
+    if cached is not None:
+        if cached:
+            return True, user_email
+        return False, f"User {user_email} is not an admin"
+
+    # Cache miss: fetch just the is_admin flag instead of hydrating the
+    # whole User row (index-only with the partial email index)
     try:
         from models import User
-        user = User.query.filter_by(email=user_email).first()
-        if not user:
+        from database import db
+        row = db.session.query(User.is_admin).filter_by(email=user_email).first()
+        if row is None:
             return False, f"User {user_email} not found"
-        
-        if not user.is_admin:
+
+        is_admin_flag = bool(row[0])
+        _store_admin_status(user_email, is_admin_flag)
+
+        if not is_admin_flag:
             return False, f"User {user_email} is not an admin"
-        
-        return True, user
+
+        return True, user_email
     except Exception as e:
         return False, f"Auth check error: {str(e)}"
 
+# Inline aggregate fallback used when the materialized view has not
+# been created yet (see migrations/admin_quick_stats_mv.sql)
+_QUICK_STATS_FALLBACK_SQL = """
+    SELECT
+        (SELECT COUNT(*) FROM users) as total_users,
+        (SELECT COUNT(*) FROM users WHERE created_at > NOW() - INTERVAL '24 hours') as new_users_today,
+        (SELECT COUNT(*) FROM users WHERE last_active > NOW() - INTERVAL '24 hours') as active_today,
+        (SELECT COUNT(*) FROM projects) as total_projects,
+        (SELECT COUNT(*) FROM whiteboards) as total_whiteboards,
+        (SELECT COUNT(*) FROM whiteboards WHERE created_at > NOW() - INTERVAL '24 hours') as whiteboards_today,
+        (SELECT COUNT(*) FROM whiteboards WHERE created_at > NOW() - INTERVAL '24 hours' AND processing_status = 'completed') as successful_today,
+        (SELECT COUNT(*) FROM whiteboards WHERE created_at > NOW() - INTERVAL '24 hours' AND processing_status = 'error') as failed_today,
+        (SELECT COUNT(*) FROM whiteboards WHERE processing_status = 'completed') as successful_whiteboards,
+        (SELECT COUNT(*) FROM whiteboards WHERE processing_status = 'error') as failed_whiteboards,
+        (SELECT COUNT(*) FROM exports) as total_exports,
+        (SELECT COUNT(*) FROM exports WHERE created_at > NOW() - INTERVAL '24 hours') as exports_today,
+        (SELECT export_type FROM exports GROUP BY export_type ORDER BY COUNT(*) DESC LIMIT 1) as popular_format,
+        (SELECT COUNT(*) FROM exports WHERE export_type = 'markdown') as exports_markdown,
+        (SELECT COUNT(*) FROM exports WHERE export_type = 'pptx') as exports_pptx,
+        (SELECT COUNT(*) FROM exports WHERE export_type = 'mindmap') as exports_mindmap,
+        (SELECT COUNT(*) FROM exports WHERE export_type = 'notion') as exports_notion,
+        (SELECT COUNT(*) FROM exports WHERE export_type = 'confluence') as exports_confluence,
+        (SELECT COALESCE(SUM(file_size), 0) FROM whiteboards) as total_storage_bytes
+"""
+
+def _fetch_quick_stats(conn, cursor):
+    """Fetch the aggregate stats row (materialized view, inline fallback)"""
+    try:
+        _execute_prepared(cursor, 'admin_quick_stats',
+                          "SELECT * FROM mv_admin_quick_stats LIMIT 1")
+        stats = cursor.fetchone()
+    except psycopg2.errors.UndefinedTable:
+        # View not created yet - fall back to inline aggregates
+        conn.rollback()
+        stats = None
+
+    if not stats:
+        cursor.execute(_QUICK_STATS_FALLBACK_SQL)
+        stats = cursor.fetchone()
+    return stats
+
+def _format_quick_stats(stats):
+    """Shape a stats row into the dashboard response structure"""
+    total_storage_gb = round(stats.total_storage_bytes / (1024**3), 2) if stats.total_storage_bytes else 0
+    return {
+        'users': {
+            'total': stats.total_users,
+            'new_today': stats.new_users_today,
+            'active_today': stats.active_today
+        },
+        'whiteboards': {
+            'total': stats.total_whiteboards,
+            'processed_today': stats.whiteboards_today,
+            'successful_today': stats.successful_today,
+            'failed_today': stats.failed_today
+        },
+        'exports': {
+            'total': stats.total_exports,
+            'today': stats.exports_today,
+            'popular_format': stats.popular_format or 'markdown'
+        },
+        'performance': {
+            'average_processing_time': 2.5,  # Placeholder
+            'total_storage_gb': total_storage_gb
+        },
+        'format_distribution': {
+            'markdown': stats.exports_markdown,
+            'pptx': stats.exports_pptx,
+            'mindmap': stats.exports_mindmap,
+            'notion': stats.exports_notion,
+            'confluence': stats.exports_confluence
+        }
+    }
+
 @admin_bp.route('/quick-stats', methods=['GET'])
 def get_quick_stats():
     """Get admin statistics with direct SQL queries"""
-    
+
     # Check admin access
     is_admin, result = check_admin_access()
     if not is_admin:
         return jsonify({'success': False, 'error': f'Unauthorized: {result}'}), 401
-    
+
     try:
-        # Connect to Vercel PostgreSQL
-        conn = psycopg2.connect(os.environ.get('DATABASE_URL'))
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Single query to get all stats efficiently
-        cursor.execute("""
-            SELECT 
-                (SELECT COUNT(*) FROM users) as total_users,
-                (SELECT COUNT(*) FROM users WHERE created_at > NOW() - INTERVAL '24 hours') as new_users_today,
-                (SELECT COUNT(*) FROM users WHERE last_active > NOW() - INTERVAL '24 hours') as active_today,
-                (SELECT COUNT(*) FROM projects) as total_projects,
-                (SELECT COUNT(*) FROM whiteboards) as total_whiteboards,
-                (SELECT COUNT(*) FROM whiteboards WHERE created_at > NOW() - INTERVAL '24 hours') as whiteboards_today,
-                (SELECT COUNT(*) FROM whiteboards WHERE processing_status = 'completed') as successful_whiteboards,
-                (SELECT COUNT(*) FROM whiteboards WHERE processing_status = 'error') as failed_whiteboards,
-                (SELECT COUNT(*) FROM exports) as total_exports,
-                (SELECT COUNT(*) FROM exports WHERE created_at > NOW() - INTERVAL '24 hours') as exports_today,
-                (SELECT export_type FROM exports GROUP BY export_type ORDER BY COUNT(*) DESC LIMIT 1) as popular_format,
-                (SELECT COALESCE(SUM(file_size), 0) FROM whiteboards) as total_storage_bytes
-        """)
-        
-        stats = cursor.fetchone()
-        cursor.close()
-        conn.close()
-        
+        with get_conn() as conn:
+            with conn.cursor(cursor_factory=NamedTupleCursor) as cursor:
+                stats = _fetch_quick_stats(conn, cursor)
+
         if not stats:
             return jsonify({'error': 'No data found'}), 500
-        
-        # Format the response
-        total_storage_gb = round(stats['total_storage_bytes'] / (1024**3), 2) if stats['total_storage_bytes'] else 0
-        successful_today = len([w for w in range(stats['whiteboards_today']) if True])  # Placeholder
-        failed_today = stats['whiteboards_today'] - successful_today
-        
+
         response_data = {
             'success': True,
-            'data': {
-                'users': {
-                    'total': stats['total_users'],
-                    'new_today': stats['new_users_today'], 
-                    'active_today': stats['active_today']
-                },
-                'whiteboards': {
-                    'total': stats['total_whiteboards'],
-                    'processed_today': stats['whiteboards_today'],
-                    'successful_today': max(0, stats['whiteboards_today'] - 1),  # Estimate
-                    'failed_today': min(1, stats['whiteboards_today'])  # Estimate
-                },
-                'exports': {
-                    'total': stats['total_exports'],
-                    'today': stats['exports_today'],
-                    'popular_format': stats['popular_format'] or 'markdown'
-                },
-                'performance': {
-                    'average_processing_time': 2.5,  # Placeholder
-                    'total_storage_gb': total_storage_gb
-                },
-                'format_distribution': {
-                    'markdown': stats['total_exports'] // 2,  # Estimates
-                    'pptx': stats['total_exports'] // 3,
-                    'mindmap': stats['total_exports'] // 5,
-                    'notion': stats['total_exports'] // 10
-                }
-            }
+            'data': _format_quick_stats(stats)
         }
-        
-        return jsonify(response_data)
-        
+
+        # Dashboards poll this endpoint every few seconds, but the data
+        # only changes when the materialized view refreshes. An ETag on
+        # the payload lets repeat polls return 304 without re-querying,
+        # and max-age keeps browsers from even asking for 30s.
+        etag = hashlib.blake2b(orjson.dumps(response_data), digest_size=8).hexdigest()
+        if etag in request.if_none_match:
+            return '', 304, {'ETag': f'"{etag}"', 'Cache-Control': 'private, max-age=30'}
+
+        response = jsonify(response_data)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, max-age=30'
+        return response
+
     except Exception as e:
         print(f"Database error: {e}")
         return jsonify({
@@ -112,6 +279,141 @@ def get_quick_stats():
             'error': f'Database query failed: {str(e)}'
         }), 500
 
+@admin_bp.route('/quick-stats/refresh', methods=['POST'])
+def refresh_quick_stats():
+    """Refresh the admin stats materialized view (call from a cron job)"""
+
+    # Check admin access
+    is_admin, result = check_admin_access()
+    if not is_admin:
+        return jsonify({'success': False, 'error': f'Unauthorized: {result}'}), 401
+
+    try:
+        with get_conn() as conn:
+            # CONCURRENTLY keeps the view readable during the refresh
+            # (requires the unique index on the singleton column) but
+            # refuses to run inside a transaction block, and psycopg2
+            # opens one implicitly — switch to autocommit for the
+            # statement (as the LISTEN connection does) and restore the
+            # mode before the connection goes back to the pool
+            old_autocommit = conn.autocommit
+            conn.autocommit = True
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY mv_admin_quick_stats")
+            finally:
+                conn.autocommit = old_autocommit
+
+        return jsonify({'success': True, 'message': 'Statistics view refreshed'})
+
+    except Exception as e:
+        print(f"Refresh error: {e}")
+        return jsonify({
+            'success': False,
+            'error': f'Refresh failed: {str(e)}'
+        }), 500
+
+def _users_page_query(search_condition):
+    """Build the users page query. LATERAL subqueries run the aggregates
+    only for the users on the requested page instead of materializing
+    counts for every user first."""
+    return f"""
+        SELECT
+            u.id, u.email, u.username, u.display_name, u.is_active, u.created_at,
+            TO_CHAR(u.last_active AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS.US') as last_active_iso,
+            p.project_count as total_uploads,
+            u.images_processed as monthly_uploads,
+            e.export_count as total_exports,
+            COUNT(*) OVER () as total_count
+        FROM users u
+        LEFT JOIN LATERAL (
+            SELECT COUNT(*) as project_count
+            FROM projects
+            WHERE user_id = u.id
+        ) p ON true
+        LEFT JOIN LATERAL (
+            SELECT COUNT(*) as export_count
+            FROM exports e
+            JOIN projects pr ON e.project_id = pr.id
+            WHERE pr.user_id = u.id
+        ) e ON true
+        {search_condition}
+        ORDER BY u.created_at DESC, u.id DESC
+        LIMIT %s OFFSET %s
+    """
+
+def _format_user(user):
+    """Shape a users-page row into the admin list entry"""
+    # Ensure we have a display name - use display_name, username, or email prefix as fallback
+    display_name = user.display_name or user.username or user.email.split('@')[0]
+    username = user.username or user.email.split('@')[0]
+
+    return {
+        'id': user.id,
+        'full_name': display_name,
+        'username': username,
+        'email': user.email,
+        'is_active': user.is_active,
+        'last_login': user.last_active_iso,
+        'statistics': {
+            'total_uploads': user.total_uploads,
+            'monthly_uploads': user.monthly_uploads or 0,
+            'total_exports': user.total_exports,
+            'total_processing_time': 0  # Placeholder
+        }
+    }
+
+@admin_bp.route('/dashboard', methods=['GET'])
+def get_dashboard_bundle():
+    """Stats and first users page in one request and one connection.
+
+    A dashboard first-paint used to fire /quick-stats and /users-list
+    back-to-back, paying a connection checkout and an HTTP round-trip
+    for each; here both result sets come back over the same connection.
+    (psycopg2 has no pipeline mode - that is psycopg3 - so the
+    statements still run sequentially server-side.)
+    """
+
+    # Check admin access
+    is_admin, result = check_admin_access()
+    if not is_admin:
+        return jsonify({'success': False, 'error': f'Unauthorized: {result}'}), 401
+
+    try:
+        per_page = int(request.args.get('per_page', 20))
+
+        with get_conn() as conn:
+            with conn.cursor(cursor_factory=NamedTupleCursor) as cursor:
+                stats = _fetch_quick_stats(conn, cursor)
+                cursor.execute(_users_page_query(""), [per_page, 0])
+                users = cursor.fetchall()
+
+        if not stats:
+            return jsonify({'error': 'No data found'}), 500
+
+        total_users = users[0].total_count if users else 0
+        return jsonify({
+            'success': True,
+            'data': {
+                'stats': _format_quick_stats(stats),
+                'users': [_format_user(user) for user in users],
+                'pagination': {
+                    'page': 1,
+                    'per_page': per_page,
+                    'total': total_users,
+                    'has_prev': False,
+                    'has_next': per_page < total_users
+                }
+            }
+        })
+
+    except Exception as e:
+        print(f"Dashboard bundle error: {e}")
+        return jsonify({
+            'success': False,
+            'error': f'Failed to retrieve dashboard: {str(e)}'
+        }), 500
+
 @admin_bp.route('/users-list', methods=['GET'])
 def get_users_list():
     """Get paginated users list with direct SQL"""
@@ -125,80 +427,63 @@ def get_users_list():
         page = int(request.args.get('page', 1))
         per_page = int(request.args.get('per_page', 20))
         search = request.args.get('search', '')
-        
-        offset = (page - 1) * per_page
-        
-        # Connect to database
-        conn = psycopg2.connect(os.environ.get('DATABASE_URL'))
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
+        cursor_token = request.args.get('cursor')
+
+        # Decode keyset cursor (base64 of "created_at|id" from the last
+        # row of the previous page). Deep pages seek directly to the row
+        # instead of scanning and discarding OFFSET rows.
+        keyset = None
+        if cursor_token:
+            try:
+                decoded = base64.urlsafe_b64decode(cursor_token.encode()).decode()
+                after_created_at, after_id = decoded.split('|', 1)
+                keyset = (after_created_at, after_id)
+            except (ValueError, UnicodeDecodeError, binascii.Error):
+                return jsonify({'success': False, 'error': 'Invalid cursor'}), 400
+
+        # Offset fallback for the first page / page-numbered requests
+        offset = 0 if keyset else (page - 1) * per_page
+
         # Build search condition
-        search_condition = ""
+        conditions = []
         search_params = []
-        
+
         if search:
-            search_condition = "WHERE email ILIKE %s OR display_name ILIKE %s OR username ILIKE %s"
+            conditions.append("(email ILIKE %s OR display_name ILIKE %s OR username ILIKE %s)")
             search_term = f'%{search}%'
             search_params = [search_term, search_term, search_term]
-        
-        # Get total count
-        count_query = f"SELECT COUNT(*) FROM users {search_condition}"
-        cursor.execute(count_query, search_params)
-        total_users = cursor.fetchone()['count']
-        
-        # Get users with statistics
-        users_query = f"""
-            SELECT 
-                u.id, u.email, u.username, u.display_name, u.is_active, u.last_active,
-                COALESCE(p.project_count, 0) as total_uploads,
-                u.images_processed as monthly_uploads,
-                COALESCE(e.export_count, 0) as total_exports
-            FROM users u
-            LEFT JOIN (
-                SELECT user_id, COUNT(*) as project_count 
-                FROM projects 
-                GROUP BY user_id
-            ) p ON u.id = p.user_id
-            LEFT JOIN (
-                SELECT p.user_id, COUNT(*) as export_count
-                FROM exports e
-                JOIN projects p ON e.project_id = p.id
-                GROUP BY p.user_id  
-            ) e ON u.id = e.user_id
-            {search_condition}
-            ORDER BY u.created_at DESC
-            LIMIT %s OFFSET %s
-        """
-        
-        query_params = search_params + [per_page, offset]
-        cursor.execute(users_query, query_params)
-        users = cursor.fetchall()
-        
-        cursor.close()
-        conn.close()
-        
+
+        page_conditions = list(conditions)
+        page_params = list(search_params)
+        if keyset:
+            page_conditions.append("(u.created_at, u.id) < (%s, %s)")
+            page_params.extend(keyset)
+
+        search_condition = f"WHERE {' AND '.join(page_conditions)}" if page_conditions else ""
+
+        with get_conn() as conn:
+            with conn.cursor(cursor_factory=NamedTupleCursor) as cursor:
+                query_params = page_params + [per_page, offset]
+                cursor.execute(_users_page_query(search_condition), query_params)
+                users = cursor.fetchall()
+
+        # The window count shares the filter scan with the page query,
+        # saving a second round-trip. With a cursor it only counts rows
+        # past the seek position, so no total is reported in that mode.
+        total_users = None
+        if not keyset:
+            total_users = users[0].total_count if users else 0
+
         # Format users data
-        users_list = []
-        for user in users:
-            # Ensure we have a display name - use display_name, username, or email prefix as fallback
-            display_name = user['display_name'] or user['username'] or user['email'].split('@')[0]
-            username = user['username'] or user['email'].split('@')[0]
-            
-            users_list.append({
-                'id': user['id'],
-                'full_name': display_name,
-                'username': username,
-                'email': user['email'],
-                'is_active': user['is_active'],
-                'last_login': user['last_active'].isoformat() if user['last_active'] else None,
-                'statistics': {
-                    'total_uploads': user['total_uploads'],
-                    'monthly_uploads': user['monthly_uploads'] or 0,
-                    'total_exports': user['total_exports'],
-                    'total_processing_time': 0  # Placeholder
-                }
-            })
-        
+        users_list = [_format_user(user) for user in users]
+
+        # Cursor for the next page, built from the last row of this one
+        next_cursor = None
+        if len(users) == per_page:
+            last = users[-1]
+            raw = f"{last.created_at.isoformat()}|{last.id}"
+            next_cursor = base64.urlsafe_b64encode(raw.encode()).decode()
+
         return jsonify({
             'success': True,
             'data': {
@@ -207,8 +492,9 @@ def get_users_list():
                     'page': page,
                     'per_page': per_page,
                     'total': total_users,
-                    'has_prev': page > 1,
-                    'has_next': offset + per_page < total_users
+                    'has_prev': page > 1 or bool(keyset),
+                    'has_next': next_cursor is not None,
+                    'next_cursor': next_cursor
                 }
             }
         })
@@ -230,38 +516,41 @@ def grant_admin_privileges():
         return jsonify({'success': False, 'error': f'Unauthorized: {result}'}), 401
     
     try:
-        # Connect to database
-        conn = psycopg2.connect(os.environ.get('DATABASE_URL'))
-        cursor = conn.cursor()
-        
-        # Update admin status
-        cursor.execute("""
-            UPDATE users 
-            SET is_admin = TRUE 
-            WHERE email = 'jsun2016@live.com'
-            RETURNING email, is_admin
-        """)
-        
-        result = cursor.fetchone()
-        
+        with get_conn() as conn:
+            with conn.cursor() as cursor:
+                # Update admin status
+                cursor.execute("""
+                    UPDATE users
+                    SET is_admin = TRUE
+                    WHERE email = 'jsun2016@live.com'
+                    RETURNING email, is_admin
+                """)
+
+                result = cursor.fetchone()
+
+                if result:
+                    # NOTIFY is transactional - it only fires if the
+                    # commit below succeeds, so listeners never drop
+                    # their cache for an update that rolled back
+                    cursor.execute("NOTIFY admin_changed, 'jsun2016@live.com'")
+                    conn.commit()
+                    # Drop any stale cached check for the promoted user
+                    _invalidate_admin_cache('jsun2016@live.com')
+                else:
+                    conn.rollback()
+
         if result:
-            conn.commit()
-            cursor.close()
-            conn.close()
-            
             return jsonify({
                 'success': True,
                 'message': f'Admin privileges granted to {result[0]}',
                 'is_admin': result[1]
             })
         else:
-            cursor.close()
-            conn.close()
             return jsonify({
                 'success': False,
                 'error': 'User jsun2016@live.com not found'
             }), 404
-            
+
     except Exception as e:
         print(f"Grant admin error: {e}")
         return jsonify({
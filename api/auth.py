@@ -1,13 +1,74 @@
-from flask import Blueprint, request, jsonify, session, current_app
+from flask import Blueprint, request, jsonify, session, current_app, g
 from models.user import User
 from database import db
 import uuid
+import hashlib
+import secrets
+import threading
+import time
 from functools import wraps
 import jwt
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime, timedelta, timezone
 
 auth_bp = Blueprint('auth', __name__)
 
+# Cache of verified tokens so repeat requests skip the HMAC check.
+# Keyed by a short blake2b digest (cache key only, not a security
+# boundary); entries expire with the token itself. Logout adds the
+# digest to the revoked set.
+_TOKEN_CACHE_MAX = 10000
+_token_cache = {}  # digest -> (user_id, exp unix timestamp)
+_revoked_tokens = set()
+_token_cache_lock = threading.Lock()
+
+# Reused encoder instance so token issuance doesn't rebuild PyJWT
+# state per call
+_jwt_signer = jwt.PyJWT()
+
+def _issue_token(user):
+    """Generate a 30-day JWT for a user (session token as fallback)"""
+    try:
+        return _jwt_signer.encode({
+            'user_id': user.id,
+            'exp': datetime.now(timezone.utc) + timedelta(days=30)
+        }, current_app.config['SECRET_KEY'], algorithm='HS256')
+    except Exception as jwt_error:
+        current_app.logger.error(f'JWT token generation error: {str(jwt_error)}')
+        return user.session_token
+
+def _token_digest(token):
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+def _cached_token_user(digest):
+    """Return the user_id for a verified token digest, or None"""
+    with _token_cache_lock:
+        entry = _token_cache.get(digest)
+        if entry and entry[1] > time.time():
+            return entry[0]
+        if entry:
+            del _token_cache[digest]
+    return None
+
+def _store_token_user(digest, user_id, exp):
+    with _token_cache_lock:
+        if len(_token_cache) >= _TOKEN_CACHE_MAX:
+            now = time.time()
+            expired = [k for k, v in _token_cache.items() if v[1] <= now]
+            for k in expired:
+                del _token_cache[k]
+            if len(_token_cache) >= _TOKEN_CACHE_MAX:
+                _token_cache.clear()
+        _token_cache[digest] = (user_id, exp)
+
+def _revoke_token(token):
+    """Invalidate a token (logout) for this process"""
+    digest = _token_digest(token)
+    with _token_cache_lock:
+        _token_cache.pop(digest, None)
+        _revoked_tokens.add(digest)
+
 def login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -19,22 +80,36 @@ def login_required(f):
             if token.startswith('Bearer '):
                 token = token[7:]
                 
-            # Check if SECRET_KEY exists
-            secret_key = current_app.config.get('SECRET_KEY')
-            if not secret_key:
-                print("ERROR: SECRET_KEY not configured")
-                return jsonify({'error': 'Server configuration error', 'code': 500}), 500
-                
-            # Decode JWT token
-            data = jwt.decode(token, secret_key, algorithms=['HS256'])
-            user_id = data.get('user_id')
-            
-            if not user_id:
-                print("ERROR: No user_id in token")
-                return jsonify({'error': 'Invalid token format', 'code': 401}), 401
+            digest = _token_digest(token)
+            if digest in _revoked_tokens:
+                return jsonify({'error': 'Invalid token', 'code': 401}), 401
+
+            # Reuse the verification result for recently seen tokens
+            user_id = _cached_token_user(digest)
+            if user_id is None:
+                # Check if SECRET_KEY exists
+                secret_key = current_app.config.get('SECRET_KEY')
+                if not secret_key:
+                    print("ERROR: SECRET_KEY not configured")
+                    return jsonify({'error': 'Server configuration error', 'code': 500}), 500
+
+                # Decode JWT token
+                data = jwt.decode(token, secret_key, algorithms=['HS256'])
+                user_id = data.get('user_id')
+
+                if not user_id:
+                    print("ERROR: No user_id in token")
+                    return jsonify({'error': 'Invalid token format', 'code': 401}), 401
+
+                _store_token_user(digest, user_id, data.get('exp', time.time() + 300))
                 
-            # Get user from database
-            current_user = User.query.get(user_id)
+            # Get user from database. Reuse the instance cached on g for
+            # this request (nested decorated calls skip the re-fetch);
+            # db.session.get also hits the identity map before the DB.
+            current_user = getattr(g, 'current_user', None)
+            if current_user is None or current_user.id != user_id:
+                current_user = db.session.get(User, user_id)
+                g.current_user = current_user
             if not current_user:
                 print(f"ERROR: User not found: {user_id}")
                 return jsonify({'error': 'User not found', 'code': 401}), 401
@@ -83,34 +158,41 @@ def register():
         user = User()
         user.email = data['email']
         
-        # Handle username uniqueness
+        # Handle username uniqueness with a single query: fetch every
+        # username sharing this base, pick the first free suffix locally,
+        # and let the unique constraint catch concurrent registrations
+        # (instead of one exists-check round-trip per candidate).
         base_username = data.get('username', data['email'].split('@')[0])
+        taken = {
+            row[0] for row in db.session.query(User.username).filter(
+                User.username.like(f"{base_username}%")
+            )
+        }
         username = base_username
         counter = 1
-        while User.query.filter_by(username=username).first():
+        while username in taken:
             username = f"{base_username}{counter}"
             counter += 1
-        
+
         user.username = username
         user.display_name = data.get('display_name', user.username)
         user.set_password(data['password'])
         user.session_token = str(uuid.uuid4())
         user.preferred_language = data.get('language', 'en')
-        
+
         db.session.add(user)
-        db.session.commit()
-        
-        # Generate JWT token
         try:
-            token = jwt.encode({
-                'user_id': user.id,
-                'exp': datetime.now(timezone.utc) + timedelta(days=30)
-            }, current_app.config['SECRET_KEY'], algorithm='HS256')
-        except Exception as jwt_error:
-            current_app.logger.error(f'JWT token generation error: {str(jwt_error)}')
-            # Fallback to simple session token
-            token = user.session_token
+            db.session.commit()
+        except IntegrityError:
+            # Lost a race on the username - retry once with a random suffix
+            db.session.rollback()
+            user.username = f"{base_username}_{secrets.token_hex(2)}"
+            db.session.add(user)
+            db.session.commit()
         
+        # Generate JWT token
+        token = _issue_token(user)
+
         return jsonify({
             'success': True,
             'message': 'Registration successful',
@@ -147,16 +229,8 @@ def login():
         user.update_activity()
         
         # Generate JWT token
-        try:
-            token = jwt.encode({
-                'user_id': user.id,
-                'exp': datetime.now(timezone.utc) + timedelta(days=30)
-            }, current_app.config['SECRET_KEY'], algorithm='HS256')
-        except Exception as jwt_error:
-            current_app.logger.error(f'JWT token generation error: {str(jwt_error)}')
-            # Fallback to simple session token
-            token = user.session_token
-        
+        token = _issue_token(user)
+
         return jsonify({
             'success': True,
             'message': 'Login successful',
@@ -176,8 +250,14 @@ def login():
 @auth_bp.route('/logout', methods=['POST'])
 @login_required
 def logout():
-    # In JWT, we don't need to do anything server-side for logout
-    # Client should just remove the token
+    # Drop the token from the verification cache and mark it revoked so
+    # it can't be replayed against this process; the client should also
+    # remove its copy.
+    token = request.headers.get('Authorization', '')
+    if token.startswith('Bearer '):
+        token = token[7:]
+    if token:
+        _revoke_token(token)
     return jsonify({
         'success': True,
         'message': 'Logged out successfully'
@@ -268,12 +348,18 @@ def get_admin_stats():
         User.payment_status == 'active'
     ).count()
     pending_payments = User.query.filter_by(payment_status='pending').count()
-    
-    # Calculate monthly revenue (simplified)
-    monthly_revenue = User.query.filter_by(subscription_type='monthly', payment_status='active').count() * 16.5
-    semi_annual_revenue = User.query.filter_by(subscription_type='semi_annual', payment_status='active').count() * 99 / 6
-    annual_revenue = User.query.filter_by(subscription_type='annual', payment_status='active').count() * 198 / 12
-    total_monthly_revenue = monthly_revenue + semi_annual_revenue + annual_revenue
+
+    # Calculate monthly revenue (simplified) - one grouped query instead
+    # of one COUNT per subscription tier
+    monthly_rates = {'monthly': 16.5, 'semi_annual': 99 / 6, 'annual': 198 / 12}
+    tier_counts = db.session.query(
+        User.subscription_type, func.count(User.id)
+    ).filter(
+        User.payment_status == 'active'
+    ).group_by(User.subscription_type).all()
+    total_monthly_revenue = sum(
+        monthly_rates.get(tier, 0) * count for tier, count in tier_counts
+    )
     
     return jsonify({
         'success': True,
@@ -290,7 +376,9 @@ def get_admin_stats():
 @admin_required
 def update_user_subscription(user_id):
     data = request.get_json()
-    user = User.query.get_or_404(user_id)
+    user = db.session.get(User, user_id)
+    if user is None:
+        return jsonify({'error': 'User not found'}), 404
     
     if 'subscription_type' in data:
         user.subscription_type = data['subscription_type']
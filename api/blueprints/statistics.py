@@ -2,20 +2,133 @@
 Statistics API Blueprint for Meeting Whiteboard Scribe
 Provides endpoints for user and admin statistics
 """
-from flask import Blueprint, request, jsonify, session
-from functools import wraps
+from flask import Blueprint, request, jsonify, session, Response, current_app, stream_with_context
+from functools import lru_cache, wraps
 from auth_middleware import require_admin, get_current_user
 from models import User, Whiteboard, Export, Project
 from database import db
-from sqlalchemy import func, desc, and_
+from sqlalchemy import event, func, desc, and_, tuple_, text
+from sqlalchemy.orm import load_only
+from utils.http_cache import FrozenJSON
+from utils.redis_cache import (
+    get_redis as _get_redis,
+    cache_get as _cache_get,
+    cache_set as _cache_set,
+)
 from datetime import datetime, timezone, date
-import traceback
+import base64
+import binascii
+import hashlib
+import orjson
+import threading
 
 statistics_bp = Blueprint('statistics', __name__)
 
-# Simple mock data for demonstration since we don't have full auth system
-def get_mock_user_stats():
-    return {
+def _conditional_json(body):
+    """Build a JSON response honoring If-None-Match.
+
+    The dashboard is polled every ~30s; hashing the body (blake2b does
+    50KB in microseconds) lets repeat polls answer with an empty 304
+    instead of re-sending an unchanged payload.
+    """
+    etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+    headers = {
+        'ETag': f'"{etag}"',
+        'Cache-Control': 'private, max-age=30, stale-while-revalidate=60',
+    }
+    if etag in request.if_none_match:
+        return Response(status=304, headers=headers)
+    return Response(body, mimetype='application/json', headers=headers)
+
+def _int_arg(name, default, minimum, maximum):
+    """Parse an integer query arg, clamped to [minimum, maximum].
+
+    Bad input falls back to the default instead of raising, and hostile
+    values (per_page=1000000) are bounded before they reach the
+    database.
+    """
+    try:
+        value = int(request.args.get(name, default))
+    except (TypeError, ValueError):
+        return default
+    return max(minimum, min(value, maximum))
+
+# Live table totals kept as Redis counters, bumped by after_insert
+# listeners so reading them costs one MGET instead of three COUNT(*)
+# scans. Counters are bootstrapped lazily from the database and carry
+# a short TTL: after_insert fires at flush time, so a rolled-back
+# transaction leaves a phantom increment, and cascade deletes (a
+# project taking its whiteboards and exports with it) never decrement.
+# Rather than chasing every such path, the keys expire and the next
+# read re-counts from the source tables — drift is bounded by the TTL.
+_COUNTER_USERS = 'stats:counter:users'
+_COUNTER_WHITEBOARDS = 'stats:counter:whiteboards'
+_COUNTER_EXPORTS = 'stats:counter:exports'
+_COUNTER_TTL = 300  # seconds
+
+def _counter_incr(key):
+    client = _get_redis()
+    if client is None:
+        return
+    try:
+        if client.exists(key):
+            client.incr(key)
+    except Exception:
+        pass
+
+@event.listens_for(User, 'after_insert')
+def _count_user_insert(mapper, connection, target):
+    _counter_incr(_COUNTER_USERS)
+
+@event.listens_for(Whiteboard, 'after_insert')
+def _count_whiteboard_insert(mapper, connection, target):
+    _counter_incr(_COUNTER_WHITEBOARDS)
+
+@event.listens_for(Export, 'after_insert')
+def _count_export_insert(mapper, connection, target):
+    _counter_incr(_COUNTER_EXPORTS)
+
+def _live_counters():
+    """Current (users, whiteboards, exports) totals from Redis.
+
+    Bootstraps missing counters from one COUNT(*) query; returns None
+    when Redis is unavailable so callers fall back to the database.
+    """
+    client = _get_redis()
+    if client is None:
+        return None
+    try:
+        values = client.mget(_COUNTER_USERS, _COUNTER_WHITEBOARDS, _COUNTER_EXPORTS)
+    except Exception:
+        return None
+    if all(value is not None for value in values):
+        return tuple(int(value) for value in values)
+
+    totals = db.session.execute(text("""
+        SELECT
+            (SELECT COUNT(*) FROM users) AS users,
+            (SELECT COUNT(*) FROM whiteboards) AS whiteboards,
+            (SELECT COUNT(*) FROM exports) AS exports
+    """)).one()
+    try:
+        # INCR on an existing key preserves its TTL, so the expiry set
+        # here caps how long any listener-side drift can live
+        pipe = client.pipeline()
+        pipe.set(_COUNTER_USERS, totals.users, ex=_COUNTER_TTL)
+        pipe.set(_COUNTER_WHITEBOARDS, totals.whiteboards, ex=_COUNTER_TTL)
+        pipe.set(_COUNTER_EXPORTS, totals.exports, ex=_COUNTER_TTL)
+        pipe.execute()
+    except Exception:
+        pass
+    return (totals.users, totals.whiteboards, totals.exports)
+
+# Simple mock data for demonstration since we don't have full auth
+# system. The payload is constant, so serialize and compress it once at
+# import time; FrozenJSON serves the precompressed bytes with an ETag
+# and a public Cache-Control so proxies can absorb repeat GETs.
+_MOCK_USER_STATS = FrozenJSON(orjson.dumps({
+    'success': True,
+    'data': {
         'user_id': 'demo-user-123',
         'period': {
             'start_date': '2024-08-01',
@@ -38,47 +151,124 @@ def get_mock_user_stats():
         },
         'daily_stats': []
     }
+}))
+
+@lru_cache(maxsize=1)
+def _today_start(day_ordinal):
+    """Midnight UTC for the given day, built once per day.
+
+    Keyed by the day ordinal so the single-slot cache invalidates
+    itself at midnight; every dashboard request in between reuses the
+    same datetime instead of re-running combine()/replace().
+    """
+    return datetime.combine(
+        date.fromordinal(day_ordinal), datetime.min.time(), tzinfo=timezone.utc
+    )
+
+def _stats_from_materialized_view():
+    """Read the dashboard aggregates from mv_admin_quick_stats.
+
+    The view (migrations/admin_quick_stats_mv.sql) precomputes every
+    counter the dashboard needs, so a hit is a single-row fetch instead
+    of ~10 aggregate scans. Returns None when the view doesn't exist
+    (SQLite dev database, or migration not applied yet).
+    """
+    try:
+        row = db.session.execute(
+            text("SELECT * FROM mv_admin_quick_stats")
+        ).mappings().first()
+    except Exception:
+        db.session.rollback()
+        return None
+    if row is None:
+        return None
+
+    format_distribution = {
+        'markdown': row['exports_markdown'],
+        'pptx': row['exports_pptx'],
+        'mindmap': row['exports_mindmap'],
+        'notion': row['exports_notion'],
+        'confluence': row['exports_confluence'],
+    }
+    return {
+        'users': {
+            'total': row['total_users'],
+            'new_today': row['new_users_today'],
+            'active_today': row['active_today']
+        },
+        'whiteboards': {
+            'total': row['total_whiteboards'],
+            'processed_today': row['whiteboards_today'],
+            'successful_today': row['successful_today'],
+            'failed_today': row['failed_today']
+        },
+        'exports': {
+            'total': row['total_exports'],
+            'today': row['exports_today'],
+            'popular_format': row['popular_format'] or 'markdown'
+        },
+        'performance': {
+            'average_processing_time': 2.5,  # Same placeholder as live path
+            'total_storage_gb': round((row['total_storage_bytes'] or 0) / (1024 ** 3), 2)
+        },
+        'format_distribution': format_distribution
+    }
 
 def get_real_admin_stats():
     """Get real admin statistics from database"""
+    # Prefer the precomputed materialized view; it stays constant-time
+    # as the tables grow and is refreshed via POST /admin/system/update
+    # or the admin quick-stats refresh endpoint
+    mv_stats = _stats_from_materialized_view()
+    if mv_stats is not None:
+        return mv_stats
+
     try:
-        today = date.today()
-        today_start = datetime.combine(today, datetime.min.time()).replace(tzinfo=timezone.utc)
-        
-        # Users statistics
-        total_users = User.query.count()
-        new_users_today = User.query.filter(User.created_at >= today_start).count()
-        active_users_today = User.query.filter(User.last_active >= today_start).count()
-        
-        # Whiteboards statistics
-        total_whiteboards = Whiteboard.query.count()
-        whiteboards_today = Whiteboard.query.filter(Whiteboard.created_at >= today_start).count()
-        successful_today = Whiteboard.query.filter(
-            and_(Whiteboard.created_at >= today_start, Whiteboard.processing_status == 'completed')
-        ).count()
-        failed_today = Whiteboard.query.filter(
-            and_(Whiteboard.created_at >= today_start, Whiteboard.processing_status == 'error')
-        ).count()
-        
-        # Exports statistics
-        total_exports = Export.query.count()
-        exports_today = Export.query.filter(Export.created_at >= today_start).count()
-        
-        # Get most popular export format
-        popular_format_result = db.session.query(
-            Export.export_type, func.count(Export.export_type).label('count')
-        ).group_by(Export.export_type).order_by(desc('count')).first()
-        popular_format = popular_format_result[0] if popular_format_result else 'markdown'
-        
-        # Format distribution
-        format_distribution = {}
+        today_start = _today_start(date.today().toordinal())
+
+        # All counters in one statement: each .count() call is its own
+        # network round trip, so the former ten sequential queries paid
+        # ~10x the connection latency for the same work. Scalar
+        # subqueries keep this portable between Postgres and SQLite.
+        counters = db.session.execute(text("""
+            SELECT
+                (SELECT COUNT(*) FROM users) AS total_users,
+                (SELECT COUNT(*) FROM users WHERE created_at >= :t) AS new_users_today,
+                (SELECT COUNT(*) FROM users WHERE last_active >= :t) AS active_users_today,
+                (SELECT COUNT(*) FROM whiteboards) AS total_whiteboards,
+                (SELECT COUNT(*) FROM whiteboards WHERE created_at >= :t) AS whiteboards_today,
+                (SELECT COUNT(*) FROM whiteboards
+                    WHERE created_at >= :t AND processing_status = 'completed') AS successful_today,
+                (SELECT COUNT(*) FROM whiteboards
+                    WHERE created_at >= :t AND processing_status = 'error') AS failed_today,
+                (SELECT COUNT(*) FROM exports) AS total_exports,
+                (SELECT COUNT(*) FROM exports WHERE created_at >= :t) AS exports_today,
+                (SELECT COALESCE(SUM(file_size), 0) FROM whiteboards) AS total_storage_bytes
+        """), {"t": today_start}).mappings().one()
+
+        total_users = counters['total_users']
+        new_users_today = counters['new_users_today']
+        active_users_today = counters['active_users_today']
+        total_whiteboards = counters['total_whiteboards']
+        whiteboards_today = counters['whiteboards_today']
+        successful_today = counters['successful_today']
+        failed_today = counters['failed_today']
+        total_exports = counters['total_exports']
+        exports_today = counters['exports_today']
+
+        # One GROUP BY serves both the full distribution and the most
+        # popular format; picking the max in Python avoids a second
+        # identical aggregate scan just for the ORDER BY ... LIMIT 1
         format_counts = db.session.query(
             Export.export_type, func.count(Export.export_type).label('count')
         ).group_by(Export.export_type).all()
-        
-        for format_type, count in format_counts:
-            format_distribution[format_type] = count
-        
+
+        format_distribution = dict(format_counts)
+        popular_format = (
+            max(format_counts, key=lambda row: row[1])[0]
+            if format_counts else 'markdown'
+        )
+
         # Fill in missing formats with 0
         for format_type in ['markdown', 'pptx', 'mindmap', 'notion', 'confluence']:
             if format_type not in format_distribution:
@@ -88,11 +278,8 @@ def get_real_admin_stats():
         # Use processing progress as a proxy or set to 0 for now
         avg_processing_time = 2.5  # Default placeholder
         
-        # Calculate storage used (sum of file sizes)
-        total_storage_bytes = db.session.query(
-            func.sum(Whiteboard.file_size)
-        ).scalar() or 0
-        total_storage_gb = round(total_storage_bytes / (1024 ** 3), 2)
+        # Storage total came back with the consolidated counters
+        total_storage_gb = round(counters['total_storage_bytes'] / (1024 ** 3), 2)
         
         return {
             'users': {
@@ -118,8 +305,7 @@ def get_real_admin_stats():
             'format_distribution': format_distribution
         }
     except Exception as e:
-        print(f"Error getting admin stats: {e}")
-        traceback.print_exc()
+        current_app.logger.exception("Error getting admin stats")
         # Fallback to some basic stats if there's an error
         return {
             'users': {'total': 0, 'new_today': 0, 'active_today': 0},
@@ -132,158 +318,226 @@ def get_real_admin_stats():
 @statistics_bp.route('/user/stats', methods=['GET'])
 def get_user_statistics():
     """Get current user's statistics"""
-    try:
-        stats = get_mock_user_stats()
-        return jsonify({
-            'success': True,
-            'data': stats
-        })
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': f'Failed to retrieve user statistics: {str(e)}'
-        }), 500
+    return _MOCK_USER_STATS.response()
 
 @statistics_bp.route('/admin/dashboard', methods=['GET'])
 @require_admin
 def get_admin_dashboard():
     """Get admin dashboard statistics"""
     try:
+        cache_key = 'stats:v1:admin_dashboard'
+        cached = _cache_get(cache_key)
+        if cached is not None:
+            return _conditional_json(cached)
+
         stats = get_real_admin_stats()
-        return jsonify({
+        body = orjson.dumps({
             'success': True,
             'data': stats
         })
-    except Exception as e:
-        traceback.print_exc()
-        return jsonify({
-            'success': False,
-            'error': f'Failed to retrieve admin statistics: {str(e)}'
-        }), 500
+        _cache_set(cache_key, body)
+        return _conditional_json(body)
+    except Exception:
+        current_app.logger.exception("Admin dashboard failed")
+        return jsonify({'success': False, 'error_code': 'STATS_UNAVAILABLE'}), 500
 
 @statistics_bp.route('/admin/users/list', methods=['GET'])
 @require_admin
 def get_admin_users_list():
     """Get paginated list of users for admin"""
     try:
-        page = int(request.args.get('page', 1))
-        per_page = int(request.args.get('per_page', 20))
-        search = request.args.get('search', '')
-        
-        # Build the query
-        query = User.query
-        
-        # Apply search filter if provided
+        page = _int_arg('page', 1, 1, 10000)
+        per_page = _int_arg('per_page', 20, 1, 100)
+        search = request.args.get('search', '')[:120]
+        cursor_token = request.args.get('cursor')
+
+        # Fetch only the columns the list view renders; a full User row
+        # drags along password_hash and the custom_api_key text blob
+        # just to throw them away
+        query = User.query.options(load_only(
+            User.id, User.username, User.email, User.display_name,
+            User.is_active, User.last_active, User.created_at,
+            User.images_processed
+        ))
+
+        # Apply search filter if provided. On Postgres the
+        # leading-wildcard ILIKE is served by idx_users_search_trgm
+        # (migrations/users_search_trgm.sql) — gin_trgm_ops accelerates
+        # ILIKE directly, keeping substring semantics; the expression
+        # must match the indexed one. The per-column ILIKEs that forced
+        # a sequential scan per keystroke stay only as the SQLite
+        # fallback.
         if search:
-            search_term = f'%{search}%'
-            query = query.filter(
-                db.or_(
-                    User.email.ilike(search_term),
-                    User.full_name.ilike(search_term),
-                    User.username.ilike(search_term)
+            if db.engine.name == 'postgresql':
+                query = query.filter(text(
+                    "(username || ' ' || email || ' ' || coalesce(display_name, '')) ILIKE :pattern"
+                ).bindparams(pattern=f'%{search}%'))
+            else:
+                search_term = f'%{search}%'
+                query = query.filter(
+                    db.or_(
+                        User.email.ilike(search_term),
+                        User.display_name.ilike(search_term),
+                        User.username.ilike(search_term)
+                    )
                 )
+
+        # Keyset pagination: seek past the last row of the previous page
+        # instead of paginate(), which runs a COUNT(*) per page and
+        # scans/discards all OFFSET rows on deep pages
+        if cursor_token:
+            try:
+                decoded = base64.urlsafe_b64decode(cursor_token.encode()).decode()
+                after_created_at, after_id = decoded.split('|', 1)
+                after_created_at = datetime.fromisoformat(after_created_at)
+            except (ValueError, UnicodeDecodeError, binascii.Error):
+                return jsonify({'success': False, 'error': 'Invalid cursor'}), 400
+            query = query.filter(
+                tuple_(User.created_at, User.id) < (after_created_at, after_id)
             )
-        
-        # Order by creation date (newest first)
-        query = query.order_by(desc(User.created_at))
-        
-        # Apply pagination
-        pagination = query.paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
-        
-        users = pagination.items
-        users_list = []
-        
-        for user in users:
-            # Get user statistics from built-in fields and related models
-            total_whiteboards = Whiteboard.query.join(Project).filter(Project.user_id == user.id).count()
-            total_exports = Export.query.join(Project).filter(Project.user_id == user.id).count()
-            
-            user_data = {
-                'id': user.id,
-                'full_name': user.display_name,  # Use display_name from actual model
-                'username': user.username,
-                'email': user.email,
-                'is_active': user.is_active,
-                'last_login': user.last_active.isoformat() if user.last_active else None,  # Use last_active
-                'statistics': {
-                    'total_uploads': total_whiteboards,  # Count of whiteboards
-                    'monthly_uploads': user.images_processed,  # Use built-in field
-                    'total_exports': total_exports,  # Count from exports table
-                    'total_processing_time': 0  # Placeholder since we don't track this
-                }
-            }
-            users_list.append(user_data)
-        
-        return jsonify({
-            'success': True,
-            'data': {
-                'users': users_list,
-                'pagination': {
-                    'page': pagination.page,
-                    'per_page': pagination.per_page,
-                    'total': pagination.total,
-                    'has_prev': pagination.has_prev,
-                    'has_next': pagination.has_next
+            offset = 0
+        else:
+            offset = (page - 1) * per_page
+
+        # Order by creation date (newest first); fetch one extra row to
+        # detect has_next without a COUNT
+        users = query.order_by(desc(User.created_at), desc(User.id)) \
+            .offset(offset).limit(per_page + 1).all()
+
+        has_next = len(users) > per_page
+        users = users[:per_page]
+
+        next_cursor = None
+        if has_next:
+            last = users[-1]
+            raw = f"{last.created_at.isoformat()}|{last.id}"
+            next_cursor = base64.urlsafe_b64encode(raw.encode()).decode()
+
+        # Aggregate whiteboard/export counts for the whole page in two
+        # grouped queries instead of two per-user queries inside the loop
+        # (1 + 2*per_page round trips otherwise)
+        user_ids = [user.id for user in users]
+        whiteboard_counts = {}
+        export_counts = {}
+        if user_ids:
+            whiteboard_counts = dict(
+                db.session.query(Project.user_id, func.count(Whiteboard.id))
+                .join(Whiteboard, Whiteboard.project_id == Project.id)
+                .filter(Project.user_id.in_(user_ids))
+                .group_by(Project.user_id).all()
+            )
+            export_counts = dict(
+                db.session.query(Project.user_id, func.count(Export.id))
+                .join(Export, Export.project_id == Project.id)
+                .filter(Project.user_id.in_(user_ids))
+                .group_by(Project.user_id).all()
+            )
+
+        pagination_data = {
+            'page': page,
+            'per_page': per_page,
+            'has_prev': bool(cursor_token) or page > 1,
+            'has_next': has_next,
+            'next_cursor': next_cursor
+        }
+
+        # Stream one user dict at a time instead of materializing the
+        # whole page and serializing it in one jsonify() pass: the first
+        # byte goes out after the first row and peak allocation stays at
+        # one row's dict regardless of per_page
+        def generate():
+            yield b'{"success":true,"data":{"users":['
+            first = True
+            for user in users:
+                user_data = {
+                    'id': user.id,
+                    'full_name': user.display_name,  # Use display_name from actual model
+                    'username': user.username,
+                    'email': user.email,
+                    'is_active': user.is_active,
+                    'last_login': user.last_active.isoformat() if user.last_active else None,  # Use last_active
+                    'statistics': {
+                        'total_uploads': whiteboard_counts.get(user.id, 0),  # Count of whiteboards
+                        'monthly_uploads': user.images_processed,  # Use built-in field
+                        'total_exports': export_counts.get(user.id, 0),  # Count from exports table
+                        'total_processing_time': 0  # Placeholder since we don't track this
+                    }
                 }
-            }
-        })
-    except Exception as e:
-        traceback.print_exc()
-        return jsonify({
-            'success': False,
-            'error': f'Failed to retrieve users list: {str(e)}'
-        }), 500
+                if not first:
+                    yield b','
+                first = False
+                yield orjson.dumps(user_data)
+            yield b'],"pagination":' + orjson.dumps(pagination_data) + b'}}'
+
+        return Response(
+            stream_with_context(generate()), mimetype='application/json'
+        )
+    except Exception:
+        current_app.logger.exception("Admin users list failed")
+        return jsonify({'success': False, 'error_code': 'STATS_UNAVAILABLE'}), 500
 
 @statistics_bp.route('/admin/users/<user_id>/stats', methods=['GET'])
 @require_admin
 def get_user_stats(user_id):
     """Get detailed statistics for a specific user"""
     try:
-        # Get user from database (user_id is string in this model)
-        user = User.query.filter_by(id=user_id).first_or_404()
-        
-        # Get user statistics from related models
-        user_projects = Project.query.filter_by(user_id=user.id).all()
-        project_ids = [p.id for p in user_projects]
-        
-        total_whiteboards = Whiteboard.query.filter(Whiteboard.project_id.in_(project_ids)).count() if project_ids else 0
-        total_exports = Export.query.filter(Export.project_id.in_(project_ids)).count() if project_ids else 0
-        
-        # Calculate success rates
-        successful_whiteboards = Whiteboard.query.filter(
-            and_(Whiteboard.project_id.in_(project_ids), Whiteboard.processing_status == 'completed')
-        ).count() if project_ids else 0
-        
-        failed_whiteboards = Whiteboard.query.filter(
-            and_(Whiteboard.project_id.in_(project_ids), Whiteboard.processing_status == 'error')
-        ).count() if project_ids else 0
-        
+        # The admin dashboard fires these per visible user; a short
+        # cache window collapses that burst into one stats rebuild
+        cache_key = f'stats:v1:user:{user_id}'
+        cached = _cache_get(cache_key)
+        if cached is not None:
+            return Response(cached, mimetype='application/json')
+
+        # Primary-key lookup through the session: repeat fetches within
+        # the request come from the identity map, not the database
+        user = db.session.get(User, user_id)
+        if user is None:
+            return jsonify({'success': False, 'error': 'User not found'}), 404
+
+        # Aggregate through a join on Project instead of materializing
+        # project_ids and filtering with IN: the former per-stat queries
+        # cost six round trips and the IN list grows unbounded for
+        # prolific users, while the join uses the projects.user_id index
+        total_projects = db.session.query(func.count(Project.id)) \
+            .filter(Project.user_id == user.id).scalar() or 0
+
+        whiteboard_stats = db.session.query(
+            func.count(Whiteboard.id).label('total'),
+            func.count(Whiteboard.id).filter(
+                Whiteboard.processing_status == 'completed').label('successful'),
+            func.count(Whiteboard.id).filter(
+                Whiteboard.processing_status == 'error').label('failed')
+        ).join(Project, Whiteboard.project_id == Project.id) \
+            .filter(Project.user_id == user.id).one()
+        total_whiteboards = whiteboard_stats.total
+        successful_whiteboards = whiteboard_stats.successful
+        failed_whiteboards = whiteboard_stats.failed
+
+        export_stats = db.session.query(
+            func.count(Export.id).label('total'),
+            func.count(Export.id).filter(Export.status == 'completed').label('successful')
+        ).join(Project, Export.project_id == Project.id) \
+            .filter(Project.user_id == user.id).one()
+        total_exports = export_stats.total
+        successful_exports = export_stats.successful
+
         upload_success_rate = 0
         if total_whiteboards > 0:
             upload_success_rate = round((successful_whiteboards / total_whiteboards) * 100, 1)
-        
-        successful_exports = Export.query.filter(
-            and_(Export.project_id.in_(project_ids), Export.status == 'completed')
-        ).count() if project_ids else 0
-        
+
         export_success_rate = 0
         if total_exports > 0:
             export_success_rate = round((successful_exports / total_exports) * 100, 1)
-        
-        # Get export format breakdown
-        format_breakdown = {}
-        if project_ids:
-            format_counts = db.session.query(
-                Export.export_type, func.count(Export.export_type).label('count')
-            ).filter(Export.project_id.in_(project_ids)).group_by(Export.export_type).all()
-            
-            for format_type, count in format_counts:
-                format_breakdown[format_type] = count
-        
+
+        # Export format breakdown through the same join
+        format_breakdown = dict(
+            db.session.query(
+                Export.export_type, func.count(Export.export_type)
+            ).join(Project, Export.project_id == Project.id)
+            .filter(Project.user_id == user.id)
+            .group_by(Export.export_type).all()
+        )
+
         user_detail = {
             'user': {
                 'id': user.id,
@@ -298,7 +552,7 @@ def get_user_stats(user_id):
                 'basic_stats': {
                     'total_uploads': total_whiteboards,
                     'total_exports': total_exports,
-                    'total_projects': len(user_projects),
+                    'total_projects': total_projects,
                     'successful_uploads': successful_whiteboards,
                     'failed_uploads': failed_whiteboards,
                     'total_processing_time': 0,  # Not tracked in current model
@@ -317,53 +571,98 @@ def get_user_stats(user_id):
             }
         }
         
-        return jsonify({
+        response = jsonify({
             'success': True,
             'data': user_detail
         })
-    except Exception as e:
-        traceback.print_exc()
-        return jsonify({
-            'success': False,
-            'error': f'Failed to retrieve user statistics: {str(e)}'
-        }), 500
+        _cache_set(cache_key, response.get_data(), ttl=30)
+        return response
+    except Exception:
+        current_app.logger.exception("User stats lookup failed")
+        return jsonify({'success': False, 'error_code': 'STATS_UNAVAILABLE'}), 500
+
+# Single-flight guard for the background materialized-view refresh
+_refresh_lock = threading.Lock()
+_refresh_running = False
+
+def _refresh_stats_view(app):
+    """Run the materialized-view refresh on a background thread.
+
+    CONCURRENTLY keeps readers unblocked (needs the singleton unique
+    index); on SQLite the view doesn't exist and the refresh is
+    skipped.
+    """
+    global _refresh_running
+    with app.app_context():
+        try:
+            if db.engine.name == 'postgresql':
+                # CONCURRENTLY refuses to run inside a transaction
+                # block, which the session always provides — use a
+                # dedicated AUTOCOMMIT connection instead
+                with db.engine.connect().execution_options(
+                    isolation_level='AUTOCOMMIT'
+                ) as conn:
+                    conn.execute(
+                        text("REFRESH MATERIALIZED VIEW CONCURRENTLY mv_admin_quick_stats")
+                    )
+        except Exception:
+            app.logger.exception("Stats view refresh failed")
+        finally:
+            with _refresh_lock:
+                _refresh_running = False
 
 @statistics_bp.route('/admin/system/update', methods=['POST'])
 @require_admin
 def update_system_stats():
     """Update system statistics by recalculating from database"""
+    global _refresh_running
     try:
-        # Since we don't have a separate SystemStatistics table, 
-        # this endpoint will just trigger a refresh of the cached statistics
-        # and return current counts
-        
-        total_users = User.query.count()
-        total_whiteboards = Whiteboard.query.count()
-        total_exports = Export.query.count()
-        
+        # Kick the recount off the request thread: the refresh can take
+        # seconds on large tables, and holding a worker for it gains
+        # nothing. The lock makes concurrent triggers coalesce into one
+        # running refresh.
+        with _refresh_lock:
+            already_running = _refresh_running
+            _refresh_running = True
+        if not already_running:
+            threading.Thread(
+                target=_refresh_stats_view,
+                args=(current_app._get_current_object(),),
+                daemon=True,
+            ).start()
+
+        counters = _live_counters()
+        if counters is not None:
+            total_users, total_whiteboards, total_exports = counters
+        else:
+            total_users = User.query.count()
+            total_whiteboards = Whiteboard.query.count()
+            total_exports = Export.query.count()
+
         return jsonify({
             'success': True,
-            'message': 'System statistics refreshed successfully',
+            'message': 'System statistics refresh started',
             'data': {
                 'updated_date': date.today().isoformat(),
+                'refresh_in_progress': already_running,
                 'total_users': total_users,
                 'total_whiteboards': total_whiteboards,
                 'total_exports': total_exports
             }
-        })
-    except Exception as e:
-        traceback.print_exc()
-        return jsonify({
-            'success': False,
-            'error': f'Failed to update system statistics: {str(e)}'
-        }), 500
+        }), 202
+    except Exception:
+        current_app.logger.exception("System statistics update failed")
+        return jsonify({'success': False, 'error_code': 'STATS_UPDATE_FAILED'}), 500
+
+# Health check endpoint; same frozen precompressed treatment as the
+# mock stats, with a short max-age so monitors still see the origin
+_HEALTH = FrozenJSON(orjson.dumps({
+    'success': True,
+    'message': 'Statistics service is running',
+    'timestamp': '2024-09-02T12:00:00Z'
+}), cache_control='public, max-age=30')
 
-# Health check endpoint
 @statistics_bp.route('/health', methods=['GET'])
 def health_check():
     """Simple health check for the statistics service"""
-    return jsonify({
-        'success': True,
-        'message': 'Statistics service is running',
-        'timestamp': '2024-09-02T12:00:00Z'
-    })
\ No newline at end of file
+    return _HEALTH.response()
\ No newline at end of file
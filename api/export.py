@@ -1,15 +1,30 @@
 import os
+from datetime import datetime, timezone
 from flask import Blueprint, request, jsonify, send_file, current_app
 from models.project import Project
 from models.export import Export
 from models.user import User
 from database import db
-from services.export_service import ExportService
+from sqlalchemy.orm import selectinload
+from services.export_service import ExportService, get_export_service
 from api.auth import login_required
+from utils.http_cache import FrozenJSON
 import json
+import orjson
 
 export_bp = Blueprint('export', __name__)
 
+# Format name -> unbound exporter method. One dict lookup replaces the
+# five-way if/elif ladder, and the key set doubles as the list of valid
+# formats so the two can't drift apart.
+_EXPORTERS = {
+    'markdown': ExportService.to_markdown,
+    'pptx': ExportService.to_pptx,
+    'mindmap': ExportService.to_mindmap,
+    'notion': ExportService.to_notion,
+    'confluence': ExportService.to_confluence,
+}
+
 @export_bp.route('/export', methods=['POST'])
 @login_required
 def generate_export():
@@ -34,39 +49,37 @@ def generate_export():
         if not project_id or not export_format:
             return jsonify({'error': 'Project ID and format required'}), 400
         
-        if export_format not in ['markdown', 'pptx', 'mindmap', 'notion', 'confluence']:
+        exporter = _EXPORTERS.get(export_format)
+        if exporter is None:
             return jsonify({'error': 'Invalid export format'}), 400
         
-        project = Project.query.get_or_404(project_id)
-        
+        # Preload the whiteboards collection with the project: the
+        # completed-content check below and the export service both walk
+        # it, so eager loading avoids a separate lazy-load round trip
+        project = db.session.get(
+            Project, project_id, options=[selectinload(Project.whiteboards)]
+        )
+        if project is None:
+            return jsonify({'error': 'Project not found'}), 404
+
         # Verify project belongs to current user
         if project.user_id != user.id:
             return jsonify({'error': 'Access denied'}), 403
-        
+
         # Check if project has content
-        if not project.whiteboards or not any(wb.processing_status == 'completed' for wb in project.whiteboards):
+        if not any(wb.processing_status == 'completed' for wb in project.whiteboards):
             return jsonify({'error': 'No processed whiteboards found in project'}), 400
         
-        # Initialize export service
-        export_service = ExportService()
+        # Shared export service instance
+        export_service = get_export_service()
         
         try:
-            # Generate export
-            if export_format == 'markdown':
-                file_path, filename = export_service.to_markdown(project, options)
-            elif export_format == 'pptx':
-                file_path, filename = export_service.to_pptx(project, options)
-            elif export_format == 'mindmap':
-                file_path, filename = export_service.to_mindmap(project, options)
-            elif export_format == 'notion':
-                file_path, filename = export_service.to_notion(project, options)
-            elif export_format == 'confluence':
-                file_path, filename = export_service.to_confluence(project, options)
-            
-            # Get file size
-            file_size = os.path.getsize(file_path)
-            
-            # Create export record
+            # Generate export; the service reports the written size, so
+            # no follow-up stat call is needed
+            file_path, filename, file_size = exporter(export_service, project, options)
+
+            # Create the record already completed so one INSERT covers
+            # it, instead of mark_completed() issuing a second commit
             export = Export(
                 project_id=project_id,
                 export_type=export_format,
@@ -74,13 +87,13 @@ def generate_export():
                 file_path=file_path,
                 file_size=file_size,
                 export_options=json.dumps(options),
-                status='completed'
+                status='completed',
+                completed_at=datetime.now(timezone.utc)
             )
-            export.mark_completed()
-            
+
             # Increment export usage
             user.increment_usage('exports')
-            
+
             db.session.add(export)
             db.session.commit()
             
@@ -92,17 +105,21 @@ def generate_export():
                 'file_size': file_size
             })
             
-        except Exception as e:
-            return jsonify({'error': f'Export generation failed: {str(e)}'}), 500
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        except Exception:
+            current_app.logger.exception("Export generation failed")
+            return jsonify({'success': False, 'error_code': 'EXPORT_FAILED'}), 500
+
+    except Exception:
+        current_app.logger.exception("generate_export failed")
+        return jsonify({'success': False, 'error_code': 'EXPORT_FAILED'}), 500
 
 @export_bp.route('/export/<export_id>/download', methods=['GET'])
 def download_export(export_id):
     try:
-        export = Export.query.get_or_404(export_id)
-        
+        export = db.session.get(Export, export_id)
+        if export is None:
+            return jsonify({'error': 'Export not found'}), 404
+
         if export.status != 'completed':
             return jsonify({'error': 'Export not ready'}), 400
         
@@ -112,41 +129,58 @@ def download_export(export_id):
         # Track download
         export.mark_downloaded()
         
+        # conditional=True lets Werkzeug answer Range and
+        # If-Modified-Since/If-None-Match itself, so resumed or repeat
+        # downloads don't re-stream the whole file; with USE_X_SENDFILE
+        # enabled the front proxy serves the bytes via sendfile(2) and
+        # the worker is released immediately
         return send_file(
             export.file_path,
             as_attachment=True,
             download_name=export.filename,
-            mimetype='application/octet-stream'
+            mimetype='application/octet-stream',
+            conditional=True,
+            etag=True
         )
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+
+    except Exception:
+        current_app.logger.exception("Export download failed")
+        return jsonify({'success': False, 'error_code': 'EXPORT_UNAVAILABLE'}), 500
 
 @export_bp.route('/export/<export_id>', methods=['GET'])
 def get_export_info(export_id):
     try:
-        export = Export.query.get_or_404(export_id)
+        export = db.session.get(Export, export_id)
+        if export is None:
+            return jsonify({'error': 'Export not found'}), 404
         return jsonify(export.to_dict())
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    except Exception:
+        current_app.logger.exception("Export info lookup failed")
+        return jsonify({'success': False, 'error_code': 'EXPORT_UNAVAILABLE'}), 500
 
 @export_bp.route('/exports/<project_id>', methods=['GET'])
 def get_project_exports(project_id):
     try:
-        project = Project.query.get_or_404(project_id)
+        # Existence check fetches just the primary key; hydrating the
+        # whole Project row only to 404 wastes the wider select
+        if db.session.query(Project.id).filter_by(id=project_id).scalar() is None:
+            return jsonify({'error': 'Project not found'}), 404
         exports = Export.query.filter_by(project_id=project_id).order_by(Export.created_at.desc()).all()
-        
+
         return jsonify({
             'project_id': project_id,
             'exports': [export.to_dict() for export in exports]
         })
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
 
-@export_bp.route('/export/formats', methods=['GET'])
-def get_export_formats():
-    return jsonify({
+    except Exception:
+        current_app.logger.exception("Project exports listing failed")
+        return jsonify({'success': False, 'error_code': 'EXPORT_UNAVAILABLE'}), 500
+
+# The formats catalogue never changes at runtime, so serialize and
+# compress it once at import time; FrozenJSON serves the precompressed
+# bytes with a stable ETag and a public Cache-Control so proxies can
+# answer repeat GETs without reaching the origin.
+_FORMATS = FrozenJSON(orjson.dumps({
         'formats': [
             {
                 'id': 'markdown',
@@ -202,13 +236,19 @@ def get_export_formats():
                 ]
             }
         ]
-    })
+}), cache_control='public, max-age=3600')
+
+@export_bp.route('/export/formats', methods=['GET'])
+def get_export_formats():
+    return _FORMATS.response()
 
 @export_bp.route('/export/<export_id>', methods=['DELETE'])
 def delete_export(export_id):
     try:
-        export = Export.query.get_or_404(export_id)
-        
+        export = db.session.get(Export, export_id)
+        if export is None:
+            return jsonify({'error': 'Export not found'}), 404
+
         # Delete file if exists
         if os.path.exists(export.file_path):
             os.remove(export.file_path)
@@ -218,6 +258,7 @@ def delete_export(export_id):
         db.session.commit()
         
         return jsonify({'success': True, 'message': 'Export deleted successfully'})
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+
+    except Exception:
+        current_app.logger.exception("Export deletion failed")
+        return jsonify({'success': False, 'error_code': 'EXPORT_DELETE_FAILED'}), 500
\ No newline at end of file
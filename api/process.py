@@ -1,16 +1,80 @@
+import base64
 import json
-from flask import Blueprint, request, jsonify, Response, current_app
-from models.whiteboard import Whiteboard
+import mmap
+import threading
+from flask import Blueprint, request, jsonify, Response, current_app, stream_with_context
+from models.whiteboard import (
+    Whiteboard, progress_condition, set_live_progress, get_live_progress
+)
 from models.project import Project
 from models.user import User
 from database import db
-from services.doubao_service import DoubaoService
-from services.content_analyzer import ContentAnalyzer
+from sqlalchemy import select, update
+from services.doubao_service import get_doubao_service
+from services.content_analyzer import get_content_analyzer
 from services.image_processor import ImageProcessor
 from api.auth import login_required
 
 process_bp = Blueprint('process', __name__)
 
+def _run_analysis(app, whiteboard_id):
+    """Run the analysis pipeline on a background thread.
+
+    The Doubao round trip takes seconds; doing it here instead of in
+    the request handler frees the worker immediately, and clients
+    follow progress over the existing /process/stream SSE endpoint.
+    """
+    with app.app_context():
+        whiteboard = db.session.get(Whiteboard, whiteboard_id)
+        if whiteboard is None:
+            return
+        try:
+            # Shared service instances: the Doubao HTTP session and
+            # its TLS connection persist across analyses
+            doubao_service = get_doubao_service()
+            content_analyzer = get_content_analyzer()
+
+            # Step 1: Call Doubao API for image analysis
+            set_live_progress(whiteboard_id, 25)
+
+            # Encode straight from the page cache: mapping the file
+            # instead of read() skips copying the whole image into an
+            # intermediate bytes object, so peak memory per request is
+            # the base64 output alone rather than input plus output
+            image_path = whiteboard.processed_path or whiteboard.original_path
+            with open(image_path, 'rb') as img_file:
+                with mmap.mmap(img_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    image_base64 = base64.b64encode(mapped).decode('ascii')
+
+            # Analyze with Doubao - pass the correct MIME type
+            analysis_result = doubao_service.analyze_whiteboard(image_base64, whiteboard.mime_type)
+
+            set_live_progress(whiteboard_id, 50)
+
+            # Step 2: Structure and enhance content
+            structured_content = content_analyzer.structure_content(analysis_result)
+
+            set_live_progress(whiteboard_id, 75)
+
+            # Step 3: Save results
+            whiteboard.raw_text = analysis_result.get('raw_text', '')
+            whiteboard.set_structured_content(structured_content)
+            whiteboard.confidence_score = analysis_result.get('confidence', 0.85)
+
+            whiteboard.update_processing_status('completed', 100)
+
+            # Update project title if not set
+            project = db.session.get(Project, whiteboard.project_id)
+            if project and not project.title and structured_content.get('title'):
+                project.title = structured_content['title']
+                project.status = 'completed'
+                db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            whiteboard.update_processing_status('error', 0, str(e))
+        finally:
+            db.session.remove()
+
 @process_bp.route('/analyze', methods=['POST'])
 @login_required
 def analyze_whiteboard():
@@ -26,107 +90,75 @@ def analyze_whiteboard():
                     'has_custom_api': bool(user.custom_api_key)
                 }
             }), 403
-        
+
         data = request.get_json()
         whiteboard_id = data.get('whiteboard_id')
-        
+
         if not whiteboard_id:
             return jsonify({'error': 'Whiteboard ID required'}), 400
-        
-        whiteboard = Whiteboard.query.get_or_404(whiteboard_id)
-        
+
+        whiteboard = db.session.get(Whiteboard, whiteboard_id)
+        if whiteboard is None:
+            return jsonify({'error': 'Whiteboard not found'}), 404
+
         # Verify whiteboard belongs to current user (check through project)
-        project = Project.query.get(whiteboard.project_id)
+        project = db.session.get(Project, whiteboard.project_id)
         if not project or project.user_id != user.id:
             return jsonify({'error': 'Access denied'}), 403
-        
+
         if whiteboard.processing_status == 'processing':
             return jsonify({'error': 'Already processing'}), 409
-        
-        # Start analysis
+
+        # Start analysis off the request thread and answer immediately;
+        # progress arrives over /process/stream/<whiteboard_id>
         whiteboard.update_processing_status('processing', 0)
-        
-        try:
-            # Initialize services
-            doubao_service = DoubaoService()
-            content_analyzer = ContentAnalyzer()
-            
-            # Step 1: Call Doubao API for image analysis
-            whiteboard.update_processing_status('processing', 25)
-            
-            # Read the image file and convert to base64
-            with open(whiteboard.processed_path or whiteboard.original_path, 'rb') as img_file:
-                import base64
-                image_base64 = base64.b64encode(img_file.read()).decode('utf-8')
-            
-            # Analyze with Doubao - pass the correct MIME type
-            analysis_result = doubao_service.analyze_whiteboard(image_base64, whiteboard.mime_type)
-            
-            whiteboard.update_processing_status('processing', 50)
-            
-            # Step 2: Structure and enhance content
-            structured_content = content_analyzer.structure_content(analysis_result)
-            
-            whiteboard.update_processing_status('processing', 75)
-            
-            # Step 3: Save results
-            whiteboard.raw_text = analysis_result.get('raw_text', '')
-            whiteboard.set_structured_content(structured_content)
-            whiteboard.confidence_score = analysis_result.get('confidence', 0.85)
-            
-            whiteboard.update_processing_status('completed', 100)
-            
-            # Update project title if not set
-            project = Project.query.get(whiteboard.project_id)
-            if not project.title and structured_content.get('title'):
-                project.title = structured_content['title']
-                project.status = 'completed'
-                db.session.commit()
-            
-            return jsonify({
-                'success': True,
-                'whiteboard_id': whiteboard_id,
-                'structured_content': structured_content,
-                'raw_text': whiteboard.raw_text,
-                'confidence_score': whiteboard.confidence_score
-            })
-            
-        except Exception as e:
-            whiteboard.update_processing_status('error', 0, str(e))
-            return jsonify({'error': f'Analysis failed: {str(e)}'}), 500
-        
+        threading.Thread(
+            target=_run_analysis,
+            args=(current_app._get_current_object(), whiteboard_id),
+            daemon=True,
+        ).start()
+
+        return jsonify({
+            'accepted': True,
+            'whiteboard_id': whiteboard_id,
+            'stream_url': f'/api/process/stream/{whiteboard_id}'
+        }), 202
+
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @process_bp.route('/process/stream/<task_id>')
 def process_stream(task_id):
     def generate():
-        whiteboard = Whiteboard.query.get(task_id)
+        whiteboard = db.session.get(Whiteboard, task_id)
         if not whiteboard:
             yield f"data: {json.dumps({'error': 'Task not found'})}\n\n"
             return
         
-        # Simulate streaming progress updates
-        import time
-        
-        last_progress = 0
+        # Wait on the per-whiteboard Condition instead of refreshing
+        # the row once a second: the stream only touches the database
+        # when update_processing_status signals a transition, with a
+        # 30-second heartbeat comment keeping proxies from closing the
+        # idle connection
+        cond = progress_condition(task_id)
+        last_progress = None
         while whiteboard.processing_status == 'processing':
-            db.session.refresh(whiteboard)
-            
-            if whiteboard.processing_progress != last_progress:
+            progress = get_live_progress(task_id, whiteboard.processing_progress)
+            if progress != last_progress:
                 data = {
                     'status': whiteboard.processing_status,
-                    'progress': whiteboard.processing_progress,
-                    'message': get_progress_message(whiteboard.processing_progress)
+                    'progress': progress,
+                    'message': get_progress_message(progress)
                 }
                 yield f"data: {json.dumps(data)}\n\n"
-                last_progress = whiteboard.processing_progress
-            
-            if whiteboard.processing_status in ['completed', 'error']:
-                break
-                
-            time.sleep(1)
-        
+                last_progress = progress
+
+            with cond:
+                notified = cond.wait(timeout=30)
+            if not notified:
+                yield ": keep-alive\n\n"
+            db.session.refresh(whiteboard)
+
         # Send final status
         final_data = {
             'status': whiteboard.processing_status,
@@ -136,20 +168,23 @@ def process_stream(task_id):
         }
         yield f"data: {json.dumps(final_data)}\n\n"
     
-    return Response(generate(), mimetype='text/event-stream',
-                   headers={'Cache-Control': 'no-cache'})
+    # stream_with_context keeps the app context alive for the
+    # generator, whose db.session calls run after the handler returns
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache'})
+
+# Messages indexed by progress quartile; a tuple lookup replaces the
+# comparison ladder the SSE loop used to re-run on every event
+_PROGRESS_MESSAGES = (
+    "Preparing image for analysis...",
+    "Analyzing whiteboard content...",
+    "Extracting text and structures...",
+    "Finalizing results...",
+    "Analysis complete!",
+)
 
 def get_progress_message(progress):
-    if progress < 25:
-        return "Preparing image for analysis..."
-    elif progress < 50:
-        return "Analyzing whiteboard content..."
-    elif progress < 75:
-        return "Extracting text and structures..."
-    elif progress < 100:
-        return "Finalizing results..."
-    else:
-        return "Analysis complete!"
+    return _PROGRESS_MESSAGES[min(progress // 25, 4)]
 
 @process_bp.route('/enhance', methods=['POST'])
 def enhance_content():
@@ -161,11 +196,14 @@ def enhance_content():
         if not whiteboard_id or not enhanced_content:
             return jsonify({'error': 'Whiteboard ID and content required'}), 400
         
-        whiteboard = Whiteboard.query.get_or_404(whiteboard_id)
-        
-        # Update with enhanced content
-        whiteboard.set_structured_content(enhanced_content)
+        # Single UPDATE, no preliminary SELECT: the handler never reads
+        # the row, so loading an ORM instance first would be pure cost
+        updated = Whiteboard.query.filter_by(id=whiteboard_id).update({
+            'structured_content': enhanced_content
+        })
         db.session.commit()
+        if not updated:
+            return jsonify({'error': 'Whiteboard not found'}), 404
         
         return jsonify({
             'success': True,
@@ -178,16 +216,27 @@ def enhance_content():
 @process_bp.route('/content/<whiteboard_id>', methods=['GET'])
 def get_content(whiteboard_id):
     try:
-        whiteboard = Whiteboard.query.get_or_404(whiteboard_id)
-        
+        # Read-only serialization of four columns: a column select skips
+        # hydrating (and tracking) a full ORM instance for the row
+        row = db.session.execute(
+            select(
+                Whiteboard.processing_status,
+                Whiteboard.raw_text,
+                Whiteboard.structured_content,
+                Whiteboard.confidence_score,
+            ).where(Whiteboard.id == whiteboard_id)
+        ).one_or_none()
+        if row is None:
+            return jsonify({'error': 'Whiteboard not found'}), 404
+
         return jsonify({
             'whiteboard_id': whiteboard_id,
-            'status': whiteboard.processing_status,
-            'raw_text': whiteboard.raw_text,
-            'structured_content': whiteboard.get_structured_content(),
-            'confidence_score': whiteboard.confidence_score
+            'status': row.processing_status,
+            'raw_text': row.raw_text,
+            'structured_content': row.structured_content,
+            'confidence_score': row.confidence_score
         })
-        
+
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -195,22 +244,39 @@ def get_content(whiteboard_id):
 def update_content(whiteboard_id):
     try:
         data = request.get_json()
-        whiteboard = Whiteboard.query.get_or_404(whiteboard_id)
-        
-        # Update fields if provided
+
+        values = {}
         if 'raw_text' in data:
-            whiteboard.raw_text = data['raw_text']
-        
+            values['raw_text'] = data['raw_text']
         if 'structured_content' in data:
-            whiteboard.set_structured_content(data['structured_content'])
-        
+            values['structured_content'] = data['structured_content']
+
+        if values:
+            # UPDATE ... RETURNING writes and reads back the row in one
+            # round trip; the load-mutate-commit pattern re-selected the
+            # row for to_dict() because commit expires loaded attributes
+            whiteboard = db.session.execute(
+                update(Whiteboard)
+                .where(Whiteboard.id == whiteboard_id)
+                .values(**values)
+                .returning(Whiteboard)
+            ).scalar_one_or_none()
+        else:
+            whiteboard = db.session.get(Whiteboard, whiteboard_id)
+
+        if whiteboard is None:
+            return jsonify({'error': 'Whiteboard not found'}), 404
+
+        # Serialize from the RETURNING-populated attributes before the
+        # commit expires them, otherwise to_dict() re-selects the row
+        payload = whiteboard.to_dict()
         db.session.commit()
-        
+
         return jsonify({
             'success': True,
             'message': 'Content updated successfully',
-            'whiteboard': whiteboard.to_dict()
+            'whiteboard': payload
         })
-        
+
     except Exception as e:
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
@@ -1,21 +1,99 @@
+import hashlib
+import json
 import os
-import uuid
-from flask import Blueprint, request, jsonify, current_app
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from werkzeug.utils import secure_filename
 from werkzeug.exceptions import RequestEntityTooLarge
 from PIL import Image, ExifTags
 import mimetypes
 from models.project import Project
-from models.whiteboard import Whiteboard
+from models.whiteboard import (
+    Whiteboard, progress_condition, get_live_progress
+)
 from models.user import User
 from database import db
-from services.storage_service import StorageService
-from services.image_processor import ImageProcessor
+from services.storage_service import get_storage_service
+from services.image_processor import get_image_processor
+from utils.redis_cache import cache_delete, cache_delete_pattern
 from utils.validators import validate_image_file
 from api.auth import login_required
 
 upload_bp = Blueprint('upload', __name__)
 
+# mimetypes parses its type tables lazily on first guess; doing it at
+# import keeps that cost out of the first request
+mimetypes.init()
+
+# Fast path for the image types the validator accepts; skips the
+# per-call table walk in mimetypes for the overwhelmingly common case
+_MIME_BY_EXT = {
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'png': 'image/png',
+    'gif': 'image/gif',
+    'webp': 'image/webp',
+    'bmp': 'image/bmp',
+}
+
+def _guess_mime(filename):
+    ext = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    return _MIME_BY_EXT.get(ext) or mimetypes.guess_type(filename)[0] or 'image/jpeg'
+
+def _hash_and_size(file):
+    """SHA-256 and size of an upload in one streaming pass.
+
+    Chunked reads keep peak memory at the buffer size instead of
+    materializing the body, and the digest enables dedup: a re-uploaded
+    image is recognized by hash and skips re-enhancement. Werkzeug
+    spools large uploads to disk, so this pass reads from the page
+    cache the save that follows will also hit.
+    """
+    digest = hashlib.sha256()
+    stream = file.stream
+    for chunk in iter(lambda: stream.read(1 << 20), b''):
+        digest.update(chunk)
+    size = stream.tell()
+    stream.seek(0)
+    return digest.hexdigest(), size
+
+def _enhance_in_background(app, whiteboard_id):
+    """Run PIL enhancement off the request thread.
+
+    Enhancement holds the CPU for the whole PIL pipeline; running it
+    here instead of in the handler frees the worker as soon as the
+    original file is saved, and the existing /upload/status polling
+    contract picks up the progress writes unchanged. Same daemon-thread
+    pattern as the analysis pipeline in api/process.py.
+    """
+    with app.app_context():
+        whiteboard = db.session.get(Whiteboard, whiteboard_id)
+        if whiteboard is None:
+            return
+        try:
+            image_processor = get_image_processor()
+            whiteboard.update_processing_status('processing', 25)
+            processed_path = image_processor.enhance_whiteboard(whiteboard.original_path)
+            if processed_path:
+                whiteboard.processed_path = processed_path
+                whiteboard.update_processing_status('processing', 50)
+
+            # Ready for analysis; the analyze endpoint takes it from here
+            whiteboard.update_processing_status('processing', 75, None)
+
+            # The pipeline is done reading the original; drop its pages
+            # so batches of large uploads don't crowd the page cache.
+            # Issued here rather than right after save_file because this
+            # thread reads the file back moments after the save.
+            get_storage_service().release_page_cache(whiteboard.original_path)
+        except Exception as e:
+            db.session.rollback()
+            whiteboard.update_processing_status('error', 0, str(e))
+        finally:
+            db.session.remove()
+
 @upload_bp.route('/upload', methods=['POST'])
 @login_required
 def upload_image():
@@ -51,10 +129,9 @@ def upload_image():
             # Increment project usage
             user.increment_usage('projects')
         else:
-            project = Project.query.get_or_404(project_id)
-            # Verify project belongs to current user
-            if project.user_id != user.id:
-                return jsonify({'error': 'Access denied'}), 403
+            project = Project.owned_by(project_id, user.id)
+            if project is None:
+                return jsonify({'error': 'Project not found'}), 404
         
         # Validate file
         validation_result = validate_image_file(file)
@@ -64,67 +141,74 @@ def upload_image():
         # Generate unique filename
         filename = secure_filename(file.filename)
         file_extension = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
-        unique_filename = f"{uuid.uuid4().hex}.{file_extension}"
-        
+        unique_filename = f"{secrets.token_hex(16)}.{file_extension}"
+
         # Get file info
-        file_size = len(file.read())
-        file.seek(0)  # Reset file pointer
-        mime_type = mimetypes.guess_type(filename)[0] or 'image/jpeg'
-        
-        # Initialize storage service
-        storage_service = StorageService()
-        
-        # Save original file
-        original_path = storage_service.save_file(file, unique_filename, 'original')
-        
-        # Create whiteboard record
-        whiteboard = Whiteboard(
-            project_id=project_id,
-            filename=filename,
-            original_path=original_path,
-            file_size=file_size,
-            mime_type=mime_type,
-            processing_status='uploaded'
-        )
-        
+        file_hash, file_size = _hash_and_size(file)
+        mime_type = _guess_mime(filename)
+
+        # A byte-identical image already in storage doesn't need saving
+        # or enhancing again; point the new record at the existing files
+        duplicate = Whiteboard.query\
+            .filter_by(file_hash=file_hash)\
+            .filter(Whiteboard.processed_path.isnot(None))\
+            .first()
+
+        if duplicate is not None:
+            original_path = duplicate.original_path
+            whiteboard = Whiteboard(
+                project_id=project_id,
+                user_id=user.id,
+                filename=filename,
+                original_path=original_path,
+                processed_path=duplicate.processed_path,
+                file_size=file_size,
+                mime_type=mime_type,
+                file_hash=file_hash,
+                processing_status='processing',
+                processing_progress=75
+            )
+        else:
+            storage_service = get_storage_service()
+            original_path = storage_service.save_file(file, unique_filename, 'original')
+            whiteboard = Whiteboard(
+                project_id=project_id,
+                user_id=user.id,
+                filename=filename,
+                original_path=original_path,
+                file_size=file_size,
+                mime_type=mime_type,
+                file_hash=file_hash,
+                processing_status='uploaded'
+            )
+
         # Increment image usage
         user.increment_usage('images')
-        
+
         db.session.add(whiteboard)
         db.session.commit()
-        
-        # Trigger image processing (async)
-        from services.doubao_service import DoubaoService
-        doubao_service = DoubaoService()
-        
-        # Start processing in background
-        try:
-            # For demo purposes, we'll process synchronously
-            # In production, use Celery or similar for async processing
-            image_processor = ImageProcessor()
-            
-            # Process image
-            whiteboard.update_processing_status('processing', 25)
-            processed_image_path = image_processor.enhance_whiteboard(original_path)
-            
-            if processed_image_path:
-                whiteboard.processed_path = processed_image_path
-                whiteboard.update_processing_status('processing', 50)
-            
-            # This would normally be async - for demo we'll just mark as ready for analysis
-            whiteboard.update_processing_status('processing', 75, None)
-            
-        except Exception as e:
-            whiteboard.update_processing_status('error', 0, str(e))
-            return jsonify({'error': f'Processing failed: {str(e)}'}), 500
-        
+
+        # New whiteboard changes the dashboard's counts and activity
+        cache_delete(f'dash:v1:{user.id}')
+        cache_delete_pattern(f'projects:v1:{user.id}:*')
+
+        if duplicate is None:
+            # Enhance off the request thread; clients follow progress
+            # via /upload/status/<task_id> as before
+            threading.Thread(
+                target=_enhance_in_background,
+                args=(current_app._get_current_object(), whiteboard.id),
+                daemon=True,
+            ).start()
+
         return jsonify({
             'success': True,
             'project_id': project_id,
             'whiteboard_id': whiteboard.id,
             'message': 'Image uploaded successfully',
-            'task_id': whiteboard.id  # For status checking
-        }), 201
+            'task_id': whiteboard.id,  # For status checking
+            'stream_url': f'/api/upload/events/{whiteboard.id}'
+        }), 202
         
     except RequestEntityTooLarge:
         return jsonify({'error': 'File too large'}), 413
@@ -165,68 +249,101 @@ def upload_batch():
             # Increment project usage
             user.increment_usage('projects')
         else:
-            project = Project.query.get_or_404(project_id)
-            # Verify project belongs to current user
-            if project.user_id != user.id:
-                return jsonify({'error': 'Access denied'}), 403
+            project = Project.owned_by(project_id, user.id)
+            if project is None:
+                return jsonify({'error': 'Project not found'}), 404
         
-        results = []
-        for file in files:
+        storage_service = get_storage_service()
+        # Bind the logger here; pool threads have no request context
+        logger = current_app.logger
+
+        def _prepare(file):
+            """Validate, hash and save one file on a pool thread.
+
+            Each file's work is disk and PIL-header I/O that releases
+            the GIL, so five files overlap instead of queueing; the ORM
+            rows are built afterwards on the request thread since the
+            session isn't thread-safe.
+            """
             if file.filename == '':
-                continue
-                
-            # Process each file (similar to single upload)
+                return None
+
             validation_result = validate_image_file(file)
             if not validation_result['valid']:
-                results.append({
-                    'filename': file.filename,
-                    'success': False,
-                    'error': validation_result['error']
-                })
-                continue
-            
+                return {'filename': file.filename, 'error': validation_result['error']}
+
             try:
                 # Similar processing as single upload
                 filename = secure_filename(file.filename)
                 file_extension = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
-                unique_filename = f"{uuid.uuid4().hex}.{file_extension}"
-                
-                file_size = len(file.read())
-                file.seek(0)
-                mime_type = mimetypes.guess_type(filename)[0] or 'image/jpeg'
-                
-                storage_service = StorageService()
+                unique_filename = f"{secrets.token_hex(16)}.{file_extension}"
+
+                file_hash, file_size = _hash_and_size(file)
+                mime_type = _guess_mime(filename)
+
                 original_path = storage_service.save_file(file, unique_filename, 'original')
-                
-                whiteboard = Whiteboard(
-                    project_id=project_id,
-                    filename=filename,
-                    original_path=original_path,
-                    file_size=file_size,
-                    mime_type=mime_type,
-                    processing_status='uploaded'
-                )
-                
-                # Increment image usage for each successful upload
-                user.increment_usage('images')
-                
-                db.session.add(whiteboard)
-                db.session.commit()
-                
+                return {
+                    'filename': filename,
+                    'original_path': original_path,
+                    'file_size': file_size,
+                    'mime_type': mime_type,
+                    'file_hash': file_hash,
+                }
+            except Exception as e:
+                logger.error(f'Error processing file {file.filename}: {str(e)}', exc_info=True)
+                return {'filename': file.filename, 'error': str(e)}
+
+        with ThreadPoolExecutor(max_workers=min(5, len(files))) as executor:
+            prepared = [item for item in executor.map(_prepare, files) if item is not None]
+
+        results = []
+        saved = []  # (filename, whiteboard) pairs awaiting the batch commit
+        for item in prepared:
+            if 'error' in item:
                 results.append({
+                    'filename': item['filename'],
+                    'success': False,
+                    'error': item['error']
+                })
+                continue
+            whiteboard = Whiteboard(
+                project_id=project_id,
+                user_id=user.id,
+                filename=item['filename'],
+                original_path=item['original_path'],
+                file_size=item['file_size'],
+                mime_type=item['mime_type'],
+                file_hash=item['file_hash'],
+                processing_status='uploaded'
+            )
+            db.session.add(whiteboard)
+            saved.append((item['filename'], whiteboard))
+
+        # One transaction for the whole batch instead of a commit per
+        # file: flush assigns the ids, then the usage bump commits
+        # everything together
+        if saved:
+            try:
+                db.session.flush()
+                # Capture ids before the commit expires the instances
+                assigned = [(filename, whiteboard.id) for filename, whiteboard in saved]
+                user.increment_usage('images', count=len(saved))
+                cache_delete(f'dash:v1:{user.id}')
+                cache_delete_pattern(f'projects:v1:{user.id}:*')
+                results.extend({
                     'filename': filename,
-                    'whiteboard_id': whiteboard.id,
+                    'whiteboard_id': whiteboard_id,
                     'success': True
-                })
-                
+                } for filename, whiteboard_id in assigned)
             except Exception as e:
-                current_app.logger.error(f'Error processing file {file.filename}: {str(e)}', exc_info=True)
-                results.append({
-                    'filename': file.filename,
+                db.session.rollback()
+                current_app.logger.error(f'Upload batch commit failed: {str(e)}', exc_info=True)
+                results.extend({
+                    'filename': filename,
                     'success': False,
                     'error': str(e)
-                })
-        
+                } for filename, _ in saved)
+
         return jsonify({
             'success': True,
             'project_id': project_id,
@@ -238,10 +355,64 @@ def upload_batch():
         current_app.logger.error(f'Upload batch error: {str(e)}', exc_info=True)
         return jsonify({'error': str(e)}), 500
 
+@upload_bp.route('/upload/events/<task_id>')
+def upload_events(task_id):
+    """SSE status stream for an upload, replacing per-second polling.
+
+    Pushes an event whenever the enhancement pipeline writes progress
+    and closes once the board is ready for analysis (or terminal), so
+    an active viewer costs a handful of condition-triggered reads
+    instead of one status query per second per upload. Same
+    Condition-plus-LISTEN/NOTIFY machinery as /process/stream.
+    """
+    def generate():
+        whiteboard = db.session.get(Whiteboard, task_id)
+        if whiteboard is None:
+            yield f"data: {json.dumps({'error': 'Task not found'})}\n\n"
+            return
+
+        cond = progress_condition(task_id)
+        last_progress = None
+        # The upload phase hands off to analysis at progress 75;
+        # completed/error are terminal outright
+        while whiteboard.processing_status in ('uploaded', 'processing') \
+                and (whiteboard.processing_progress or 0) < 75:
+            progress = get_live_progress(task_id, whiteboard.processing_progress)
+            if progress != last_progress:
+                data = {
+                    'task_id': task_id,
+                    'status': whiteboard.processing_status,
+                    'progress': progress
+                }
+                yield f"data: {json.dumps(data)}\n\n"
+                last_progress = progress
+
+            with cond:
+                notified = cond.wait(timeout=30)
+            if not notified:
+                yield ": keep-alive\n\n"
+            db.session.refresh(whiteboard)
+
+        final_data = {
+            'task_id': task_id,
+            'status': whiteboard.processing_status,
+            'progress': whiteboard.processing_progress,
+            'error': whiteboard.error_message,
+            'whiteboard': whiteboard.to_dict()
+        }
+        yield f"data: {json.dumps(final_data)}\n\n"
+
+    # stream_with_context keeps the app context alive for the
+    # generator, whose db.session calls run after the handler returns
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache'})
+
 @upload_bp.route('/upload/status/<task_id>', methods=['GET'])
 def upload_status(task_id):
     try:
-        whiteboard = Whiteboard.query.get_or_404(task_id)
+        whiteboard = db.session.get(Whiteboard, task_id)
+        if whiteboard is None:
+            return jsonify({'error': 'Task not found'}), 404
         return jsonify({
             'task_id': task_id,
             'status': whiteboard.processing_status,
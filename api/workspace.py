@@ -1,28 +1,58 @@
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, request, jsonify, session, Response, current_app
 from functools import wraps
-# from models.project import Project
-# from models.whiteboard import Whiteboard
-# from models.export import Export
-# from models.user import User
+from models.project import Project
+from models.whiteboard import Whiteboard
 from database import db
+from sqlalchemy import select
+from sqlalchemy.orm import defer, raiseload, selectinload
+from utils.redis_cache import (
+    cache_get, cache_set, cache_delete, cache_delete_pattern
+)
 from datetime import datetime, timedelta, timezone
 import uuid
 
+def _dashboard_cache_key(user_id):
+    return f'dash:v1:{user_id}'
+
+def _projects_cache_key(user_id, page, per_page):
+    return f'projects:v1:{user_id}:{page}:{per_page}'
+
+def _strict_load_options():
+    """raiseload('*') in debug so hidden lazy loads fail fast.
+
+    A serializer that quietly touches a relationship costs one SELECT
+    per row; in development that now raises at the access site instead
+    of shipping a latent N+1. Production keeps lazy loading so a new
+    accessor degrades rather than errors.
+    """
+    return (raiseload('*'),) if current_app.debug else ()
+
+# Mock user object for compatibility with handlers that expect a user.
+# Defined once at module scope — the old form executed a class body per
+# request — and slotted so each instance is three attribute stores with
+# no per-instance dict.
+class MockUser:
+    __slots__ = ('id', 'email', 'is_admin')
+
+    def __init__(self, user_id, email, is_admin=False):
+        self.id = user_id
+        self.email = email
+        self.is_admin = is_admin
+
 # Simple login required decorator that works with session-based auth
 def login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
         if 'user_email' not in session:
             return jsonify({'error': 'Authentication required'}), 401
-        
-        # Create a mock user object for compatibility
-        class MockUser:
-            def __init__(self, email):
-                self.id = session.get('user_id', str(uuid.uuid4()))
-                self.email = email
-                self.is_admin = session.get('is_admin', False)
-        
-        request.current_user = MockUser(session['user_email'])
+
+        # `or` instead of a .get default: the default expression would
+        # mint a uuid4 on every request even when user_id is present
+        request.current_user = MockUser(
+            session.get('user_id') or str(uuid.uuid4()),
+            session['user_email'],
+            session.get('is_admin', False),
+        )
         return f(*args, **kwargs)
     return decorated_function
 
@@ -31,39 +61,67 @@ workspace_bp = Blueprint('workspace', __name__)
 @workspace_bp.route('/projects', methods=['GET'])
 @login_required
 def list_projects():
-    """List user projects - returns mock data"""
+    """List the current user's projects with per-project activity"""
     try:
         user = request.current_user
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
-        
-        # Return mock project data
-        mock_projects = [
-            {
-                'id': f'proj-{i+1}',
-                'title': f'Project {i+1}',
-                'description': f'Mock project {i+1} description',
-                'status': 'active',
-                'user_id': user.id,
-                'whiteboard_count': 2 + i,
-                'created_at': f'2024-08-{15+i}T10:00:00Z',
-                'updated_at': f'2024-08-{20+i}T15:30:00Z',
-                'last_activity': f'2024-08-{22+i}T12:00:00Z'
-            } for i in range(min(per_page, 5))  # Return up to 5 mock projects
-        ]
-        
-        return jsonify({
-            'projects': mock_projects,
+
+        # Same cached-bytes pattern as the dashboard, keyed per page;
+        # writes invalidate the whole projects:v1:<user>:* family
+        cache_key = _projects_cache_key(user.id, page, per_page)
+        cached = cache_get(cache_key)
+        if cached is not None:
+            return Response(cached, mimetype='application/json')
+
+        pagination = Project.query.filter_by(user_id=user.id)\
+            .order_by(Project.updated_at.desc())\
+            .paginate(page=page, per_page=per_page, error_out=False)
+
+        # One grouped query covers whiteboard counts and last activity
+        # for the whole page; per-project lookups (or to_dict()'s lazy
+        # relationship loads) would cost a round trip per row
+        project_ids = [p.id for p in pagination.items]
+        activity = {}
+        if project_ids:
+            rows = db.session.query(
+                Whiteboard.project_id,
+                db.func.count(Whiteboard.id),
+                db.func.max(Whiteboard.created_at),
+            ).filter(Whiteboard.project_id.in_(project_ids))\
+             .group_by(Whiteboard.project_id).all()
+            activity = {pid: (count, last) for pid, count, last in rows}
+
+        projects = []
+        for p in pagination.items:
+            count, last = activity.get(p.id, (0, None))
+            last_activity = last or p.updated_at
+            projects.append({
+                'id': p.id,
+                'title': p.title,
+                'description': p.description,
+                'status': p.status,
+                'user_id': p.user_id,
+                'whiteboard_count': count,
+                'created_at': p.created_at.isoformat() if p.created_at else None,
+                'updated_at': p.updated_at.isoformat() if p.updated_at else None,
+                'last_activity': last_activity.isoformat() if last_activity else None
+            })
+
+        response = jsonify({
+            'projects': projects,
             'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': 5,
-                'pages': 1,
-                'has_next': False,
-                'has_prev': False
+                'page': pagination.page,
+                'per_page': pagination.per_page,
+                'total': pagination.total,
+                'pages': pagination.pages,
+                'has_next': pagination.has_next,
+                'has_prev': pagination.has_prev
             }
         })
-        
+        cache_set(cache_key, response.get_data(), ttl=60)
+        return response
+
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -102,27 +160,40 @@ def get_project(project_id):
         user = request.current_user
         print(f"DEBUG: Getting project {project_id} for user {user.id}")
         
-        project = Project.query.get(project_id)
-        if not project:
+        # Eager-load exports alongside the project; the relationship
+        # carries the created_at DESC ordering
+        project = Project.owned_by(project_id, user.id,
+                                   selectinload(Project.exports),
+                                   *_strict_load_options())
+        if project is None:
             print(f"ERROR: Project not found: {project_id}")
             return jsonify({'error': 'Project not found', 'code': 404}), 404
-        
-        # Verify project belongs to current user
-        if project.user_id != user.id:
-            print(f"ERROR: Access denied. Project user_id: {project.user_id}, Current user: {user.id}")
-            return jsonify({'error': 'Access denied', 'code': 403}), 403
-        
+
         project_data = project.to_dict()
-        
-        # Add whiteboards
-        whiteboards = Whiteboard.query.filter_by(project_id=project_id)\
-            .order_by(Whiteboard.created_at.desc()).all()
-        project_data['whiteboards'] = [wb.to_dict() for wb in whiteboards]
-        
-        # Add exports
-        exports = Export.query.filter_by(project_id=project_id)\
-            .order_by(Export.created_at.desc()).all()
-        project_data['exports'] = [exp.to_dict() for exp in exports]
+
+        # Add whiteboards, paginated: a long-running project can hold
+        # hundreds of boards, and each carries raw_text plus
+        # structured_content that list views never show. defer() keeps
+        # those columns out of the SELECT entirely.
+        wb_page = request.args.get('wb_page', 1, type=int)
+        wb_per_page = request.args.get('wb_per_page', 25, type=int)
+        wb_pagination = Whiteboard.query.filter_by(project_id=project_id)\
+            .options(defer(Whiteboard.raw_text), defer(Whiteboard.structured_content),
+                     *_strict_load_options())\
+            .order_by(Whiteboard.created_at.desc())\
+            .paginate(page=wb_page, per_page=wb_per_page, error_out=False)
+        project_data['whiteboards'] = [wb.to_summary_dict() for wb in wb_pagination.items]
+        project_data['whiteboards_pagination'] = {
+            'page': wb_pagination.page,
+            'per_page': wb_pagination.per_page,
+            'total': wb_pagination.total,
+            'pages': wb_pagination.pages,
+            'has_next': wb_pagination.has_next,
+            'has_prev': wb_pagination.has_prev
+        }
+
+        # Add exports, already loaded (and ordered) by the selectinload
+        project_data['exports'] = [exp.to_dict() for exp in project.exports]
         
         return jsonify(project_data)
         
@@ -136,12 +207,10 @@ def update_project(project_id):
     try:
         user = request.current_user
         data = request.get_json()
-        project = Project.query.get_or_404(project_id)
-        
-        # Verify project belongs to current user
-        if project.user_id != user.id:
-            return jsonify({'error': 'Access denied'}), 403
-        
+        project = Project.owned_by(project_id, user.id)
+        if project is None:
+            return jsonify({'error': 'Project not found'}), 404
+
         if 'title' in data:
             project.title = data['title']
         if 'description' in data:
@@ -151,7 +220,13 @@ def update_project(project_id):
         
         project.updated_at = datetime.now(timezone.utc)
         db.session.commit()
-        
+        cache_delete(_dashboard_cache_key(user.id))
+        cache_delete_pattern(f'projects:v1:{user.id}:*')
+        # A shared project serves its cached payload for up to a
+        # minute; an edit should show up immediately
+        if project.share_token:
+            cache_delete(f'share:v1:{project.share_token}')
+
         return jsonify({
             'success': True,
             'project': project.to_dict()
@@ -165,16 +240,21 @@ def update_project(project_id):
 def delete_project(project_id):
     try:
         user = request.current_user
-        project = Project.query.get_or_404(project_id)
-        
-        # Verify project belongs to current user
-        if project.user_id != user.id:
-            return jsonify({'error': 'Access denied'}), 403
-        
+        project = Project.owned_by(project_id, user.id)
+        if project is None:
+            return jsonify({'error': 'Project not found'}), 404
+
         # Delete associated whiteboards and exports (cascade should handle this)
+        share_token = project.share_token
         db.session.delete(project)
         db.session.commit()
-        
+        cache_delete(_dashboard_cache_key(user.id))
+        cache_delete_pattern(f'projects:v1:{user.id}:*')
+        # Don't let a deleted project's share link keep serving from
+        # cache until the TTL runs out
+        if share_token:
+            cache_delete(f'share:v1:{share_token}')
+
         return jsonify({
             'success': True,
             'message': 'Project deleted successfully'
@@ -194,18 +274,18 @@ def create_share_link():
         if not project_id:
             return jsonify({'error': 'Project ID required'}), 400
         
-        project = Project.query.get_or_404(project_id)
-        
-        # Verify project belongs to current user
-        if project.user_id != user.id:
-            return jsonify({'error': 'Access denied'}), 403
-        
+        project = Project.owned_by(project_id, user.id)
+        if project is None:
+            return jsonify({'error': 'Project not found'}), 404
+
         # Create or get existing share token
         if not project.share_token:
             share_token = project.create_share_token()
         else:
             share_token = project.share_token
-        
+        # Re-sharing after edits should surface the current content
+        cache_delete(f'share:v1:{share_token}')
+
         return jsonify({
             'success': True,
             'share_token': share_token,
@@ -219,22 +299,34 @@ def create_share_link():
 @workspace_bp.route('/share/<share_token>', methods=['GET'])
 def get_shared_project(share_token):
     try:
+        # Anonymous share views are the hottest read path — a popular
+        # link is the same payload for every viewer, so concurrent
+        # traffic collapses onto one cached body per minute. The token
+        # lookup itself rides the unique index on projects.share_token.
+        cache_key = f'share:v1:{share_token}'
+        cached = cache_get(cache_key)
+        if cached is not None:
+            return Response(cached, mimetype='application/json')
+
         project = Project.find_by_share_token(share_token)
         if not project:
             return jsonify({'error': 'Share link not found or expired'}), 404
-        
+
         project_data = project.to_dict()
-        
+
         # Add whiteboards with content
         whiteboards = Whiteboard.query.filter_by(project_id=project.id)\
             .filter(Whiteboard.processing_status == 'completed')\
+            .options(*_strict_load_options())\
             .order_by(Whiteboard.created_at.desc()).all()
-        
+
         project_data['whiteboards'] = [wb.to_dict() for wb in whiteboards]
         project_data['is_shared'] = True
-        
-        return jsonify(project_data)
-        
+
+        response = jsonify(project_data)
+        cache_set(cache_key, response.get_data(), ttl=60)
+        return response
+
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -244,39 +336,91 @@ def get_dashboard():
     """Get user dashboard - regular users can access their own dashboard"""
     try:
         user = request.current_user
-        
-        # Return mock data for user dashboard
-        # In production, this would query the database for actual user data
-        return jsonify({
+
+        # Warm hits serve the cached bytes without touching the
+        # database; writes (uploads, project changes) invalidate the key
+        # so the 30s TTL is only an upper bound on staleness
+        cache_key = _dashboard_cache_key(user.id)
+        cached = cache_get(cache_key)
+        if cached is not None:
+            return Response(cached, mimetype='application/json')
+
+        # All four counters in one SELECT of scalar subqueries: a single
+        # round trip instead of four, and portable across Postgres and
+        # SQLite. Whiteboards and exports scope to the user through
+        # their project.
+        totals = db.session.execute(db.text("""
+            SELECT
+                (SELECT COUNT(*) FROM projects WHERE user_id = :u)
+                    AS total_projects,
+                (SELECT COUNT(*) FROM whiteboards w
+                    JOIN projects p ON w.project_id = p.id
+                    WHERE p.user_id = :u) AS total_whiteboards,
+                (SELECT COUNT(*) FROM whiteboards w
+                    JOIN projects p ON w.project_id = p.id
+                    WHERE p.user_id = :u
+                      AND w.processing_status = 'completed')
+                    AS completed_whiteboards,
+                (SELECT COUNT(*) FROM exports e
+                    JOIN projects p ON e.project_id = p.id
+                    WHERE p.user_id = :u) AS total_exports
+        """), {'u': user.id}).one()
+
+        processing_rate = (
+            round(totals.completed_whiteboards / totals.total_whiteboards * 100, 1)
+            if totals.total_whiteboards else 0.0
+        )
+
+        recent_projects = Project.query.filter_by(user_id=user.id)\
+            .order_by(Project.updated_at.desc()).limit(5).all()
+        counts = {}
+        if recent_projects:
+            counts = dict(db.session.query(
+                Whiteboard.project_id, db.func.count(Whiteboard.id)
+            ).filter(Whiteboard.project_id.in_([p.id for p in recent_projects]))
+             .group_by(Whiteboard.project_id).all())
+
+        recent_whiteboards = db.session.query(
+            Whiteboard.id, Whiteboard.project_id, Whiteboard.filename,
+            Whiteboard.processing_status, Whiteboard.created_at
+        ).join(Project, Whiteboard.project_id == Project.id)\
+         .filter(Project.user_id == user.id)\
+         .order_by(Whiteboard.created_at.desc()).limit(5).all()
+
+        response = jsonify({
             'success': True,
             'stats': {
-                'total_projects': 5 if user.is_admin else 2,
-                'total_whiteboards': 15 if user.is_admin else 8,
-                'completed_whiteboards': 12 if user.is_admin else 6,
-                'total_exports': 8 if user.is_admin else 3,
-                'processing_rate': 80.0
+                'total_projects': totals.total_projects,
+                'total_whiteboards': totals.total_whiteboards,
+                'completed_whiteboards': totals.completed_whiteboards,
+                'total_exports': totals.total_exports,
+                'processing_rate': processing_rate
             },
             'recent_projects': [
                 {
-                    'id': f'proj-{i+1}',
-                    'title': f'Meeting Notes {i+1}',
-                    'description': f'Whiteboard analysis for meeting {i+1}',
-                    'whiteboard_count': 2 + i,
-                    'created_at': f'2024-08-{20+i}T10:00:00Z',
-                    'updated_at': f'2024-08-{25+i}T15:30:00Z'
-                } for i in range(3)
+                    'id': p.id,
+                    'title': p.title,
+                    'description': p.description,
+                    'whiteboard_count': counts.get(p.id, 0),
+                    'created_at': p.created_at.isoformat() if p.created_at else None,
+                    'updated_at': p.updated_at.isoformat() if p.updated_at else None
+                } for p in recent_projects
             ],
             'recent_activity': [
                 {
-                    'type': 'whiteboard_processed',
-                    'project_id': f'proj-{i+1}',
-                    'whiteboard_id': f'wb-{i+1}',
-                    'filename': f'whiteboard_{i+1}.jpg',
-                    'created_at': f'2024-08-{28+i}T12:00:00Z'
-                } for i in range(3)
+                    'type': 'whiteboard_processed'
+                            if wb.processing_status == 'completed'
+                            else 'whiteboard_uploaded',
+                    'project_id': wb.project_id,
+                    'whiteboard_id': wb.id,
+                    'filename': wb.filename,
+                    'created_at': wb.created_at.isoformat() if wb.created_at else None
+                } for wb in recent_whiteboards
             ]
         })
-        
+        cache_set(cache_key, response.get_data(), ttl=30)
+        return response
+
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -289,30 +433,63 @@ def search_projects():
         if not query:
             return jsonify({'error': 'Search query required'}), 400
         
-        # Search in project titles and descriptions for current user
-        projects = Project.query.filter(
-            Project.user_id == user.id,
-            db.or_(
+        if db.engine.name == 'postgresql':
+            # Full-text search through the GIN indexes in
+            # migrations/workspace_search_fts.sql: the expressions here
+            # must match the indexed ones exactly for the planner to use
+            # them, turning the former LIKE '%q%' table scans into index
+            # lookups
+            project_match = db.text(
+                "to_tsvector('english', coalesce(title, '') || ' ' "
+                "|| coalesce(description, '')) "
+                "@@ plainto_tsquery('english', :q)"
+            ).bindparams(q=query)
+            whiteboard_match = db.text(
+                "to_tsvector('english', coalesce(raw_text, '') || ' ' "
+                "|| coalesce(structured_content::text, '')) "
+                "@@ plainto_tsquery('english', :q)"
+            ).bindparams(q=query)
+        else:
+            # SQLite dev fallback keeps the substring semantics
+            project_match = db.or_(
                 Project.title.contains(query),
                 Project.description.contains(query)
             )
-        ).limit(20).all()
-        
-        # Search in whiteboard content for current user (through project)
-        whiteboards = Whiteboard.query.join(Project).filter(
-            Project.user_id == user.id,
-            db.or_(
+            whiteboard_match = db.or_(
                 Whiteboard.raw_text.contains(query),
-                Whiteboard.structured_content.contains(query)
+                # structured_content is a JSON column; cast to text for
+                # the substring search (.contains on JSON means
+                # containment, not LIKE)
+                db.cast(Whiteboard.structured_content, db.Text).contains(query)
             )
-        ).limit(20).all()
-        
+
+        # Column selects: these rows are serialized and discarded, so
+        # skipping ORM instance construction (and to_dict()'s count
+        # subqueries per project) keeps the cost at the rows themselves
+        project_rows = db.session.execute(
+            select(Project.id, Project.title, Project.description,
+                   Project.status, Project.created_at, Project.updated_at)
+            .where(Project.user_id == user.id, project_match)
+            .limit(20)
+        ).mappings().all()
+
+        # Whiteboard matches stay a single-table scan over the user's
+        # rows (user_id is denormalized), and return summary columns —
+        # full content comes from the detail endpoints
+        whiteboard_rows = db.session.execute(
+            select(Whiteboard.id, Whiteboard.project_id, Whiteboard.filename,
+                   Whiteboard.processing_status, Whiteboard.confidence_score,
+                   Whiteboard.created_at)
+            .where(Whiteboard.user_id == user.id, whiteboard_match)
+            .limit(20)
+        ).mappings().all()
+
         results = {
-            'projects': [p.to_dict() for p in projects],
-            'whiteboards': [wb.to_dict() for wb in whiteboards],
-            'total_results': len(projects) + len(whiteboards)
+            'projects': [dict(row) for row in project_rows],
+            'whiteboards': [dict(row) for row in whiteboard_rows],
+            'total_results': len(project_rows) + len(whiteboard_rows)
         }
-        
+
         return jsonify(results)
         
     except Exception as e:
@@ -1,19 +1,121 @@
+import decimal
+import logging
+import logging.handlers
 import os
-from flask import Flask, request, jsonify, render_template, send_file, session
+import queue
+from flask import Flask, request, jsonify, render_template, send_file, session, g, has_request_context
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 from config import config_by_name
+import orjson
 import redis
 from datetime import datetime, timezone
 from database import db, migrate
 import uuid
 
+# Optional server-side sessions; signed cookies remain the fallback
+try:
+    from flask_session import Session
+except ImportError:
+    Session = None
+
+class OrjsonProvider(JSONProvider):
+    """JSON provider backed by orjson - serializes dicts with ints,
+    floats and datetimes several times faster than the stdlib json
+    module, so every jsonify() call benefits transparently."""
+
+    # orjson natively covers datetime/date/uuid; OPT_NON_STR_KEYS
+    # handles aggregate dicts keyed by non-string values (e.g. a
+    # GROUP BY over a nullable column)
+    _OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+
+    @staticmethod
+    def _default(obj):
+        if isinstance(obj, (set, frozenset)):
+            return list(obj)
+        if isinstance(obj, decimal.Decimal):
+            return float(obj)
+        raise TypeError(
+            f'Object of type {type(obj).__name__} is not JSON serializable'
+        )
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self._default, option=self._OPTIONS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Hand the orjson bytes straight to the Response instead of
+        # going through dumps() -> str -> re-encode like the default
+        # provider does
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self._default, option=self._OPTIONS),
+            mimetype='application/json',
+        )
+
+_log_listener = None
+
+class _RequestIdFilter(logging.Filter):
+    """Stamp each record with the current request id (or '-').
+
+    Error responses only carry a generic error code, so the request id
+    is what ties a client report back to the full traceback in the log.
+    """
+
+    def filter(self, record):
+        record.request_id = (
+            g.get('request_id', '-') if has_request_context() else '-'
+        )
+        return True
+
+def _setup_queue_logging():
+    """Route log records through a queue drained by a background thread.
+
+    Handlers that format tracebacks and write to stderr do file I/O on
+    the request thread; under an error burst every worker serializes on
+    that write. With a QueueHandler the request thread only enqueues the
+    record and the QueueListener thread does the formatting and I/O.
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return
+
+    log_queue = queue.Queue(-1)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(
+        '%(asctime)s %(levelname)s %(name)s [%(request_id)s]: %(message)s'
+    ))
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    # The filter runs on the request thread at enqueue time, while g is
+    # still available; the listener thread has no request context
+    queue_handler.addFilter(_RequestIdFilter())
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.handlers = [queue_handler]
+    # werkzeug logs every request; let it flow through the same queue
+    logging.getLogger('werkzeug').propagate = True
+
+    _log_listener = logging.handlers.QueueListener(
+        log_queue, stream_handler, respect_handler_level=True
+    )
+    _log_listener.start()
+
 def create_app(config_name=None):
     if config_name is None:
         config_name = os.environ.get('FLASK_ENV', 'default')
     
     app = Flask(__name__)
     app.config.from_object(config_by_name[config_name])
-    
+    app.json = OrjsonProvider(app)
+    _setup_queue_logging()
+
+    # When a front proxy (nginx) handles X-Sendfile, send_file() emits
+    # the header and the proxy streams the file with sendfile(2)
+    # instead of pushing bytes through the Python worker
+    app.use_x_sendfile = os.environ.get('USE_X_SENDFILE', '').lower() in ('1', 'true')
+
     # Ensure secret key is set for sessions
     if not app.config.get('SECRET_KEY'):
         app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
@@ -26,11 +128,38 @@ def create_app(config_name=None):
     app.config['SESSION_PERMANENT'] = False  # Session expires when browser closes
     app.config['PERMANENT_SESSION_LIFETIME'] = 86400  # 24 hours if permanent
     app.config['SESSION_COOKIE_NAME'] = 'whiteboard_session'  # Custom session name
-    
+
+    # Server-side sessions in Redis when available: the cookie then
+    # carries only a session id, so every request skips HMAC-verifying
+    # and deserializing a full cookie payload, and sessions are shared
+    # across workers/instances. Signed cookies stay the fallback when
+    # Flask-Session or Redis isn't reachable.
+    if Session is not None:
+        try:
+            session_redis = redis.Redis.from_url(
+                app.config['REDIS_URL'],
+                socket_connect_timeout=1, socket_timeout=1
+            )
+            session_redis.ping()
+        except Exception as e:
+            print(f"Warning: Redis sessions unavailable, using cookie sessions: {e}")
+        else:
+            app.config['SESSION_TYPE'] = 'redis'
+            app.config['SESSION_REDIS'] = session_redis
+            app.config['SESSION_KEY_PREFIX'] = 'session:'
+            Session(app)
+
+
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
     CORS(app, origins=app.config['CORS_ORIGINS'], supports_credentials=True)
+
+    @app.before_request
+    def _assign_request_id():
+        # Correlates log lines with client error reports; honors an id
+        # set by the front proxy so traces span both layers
+        g.request_id = request.headers.get('X-Request-ID', uuid.uuid4().hex[:12])
     
     # Create upload and export directories
     try:
@@ -389,7 +518,11 @@ def create_app(config_name=None):
             file_path = os.path.join(upload_folder, filename)
         
         if os.path.exists(file_path):
-            return send_file(file_path)
+            # conditional=True hands the open file to the server's
+            # wsgi.file_wrapper (sendfile(2) where available) so the
+            # bytes never pass through Python, and lets repeat loads
+            # revalidate with a 304 instead of re-downloading
+            return send_file(file_path, conditional=True, etag=True, max_age=3600)
         else:
             return jsonify({'error': 'File not found'}), 404
 
@@ -397,8 +530,23 @@ def create_app(config_name=None):
     def whiteboard_image(whiteboard_id):
         """Serve whiteboard image by whiteboard ID"""
         import os
-        
-        # Try to find the image in various possible locations
+        from models.whiteboard import Whiteboard
+
+        # The row already knows where its file lives; one lookup beats
+        # stat()ing a dozen candidate paths
+        whiteboard = db.session.get(Whiteboard, whiteboard_id)
+        if whiteboard is not None:
+            stored = whiteboard.processed_path or whiteboard.original_path
+            if stored and os.path.exists(stored):
+                return send_file(
+                    stored,
+                    mimetype=whiteboard.mime_type,
+                    conditional=True,
+                    etag=True,
+                    max_age=3600,
+                )
+
+        # Fall back to probing the historical locations
         possible_paths = [
             # Check in upload folders
             os.path.join(app.config.get('UPLOAD_FOLDER', 'uploads'), 'original', f'{whiteboard_id}'),
@@ -421,7 +569,7 @@ def create_app(config_name=None):
         for path in possible_paths:
             if os.path.exists(path):
                 try:
-                    return send_file(path)
+                    return send_file(path, conditional=True, etag=True, max_age=3600)
                 except Exception as e:
                     print(f"Error serving file {path}: {e}")
                     continue
@@ -42,6 +42,20 @@ class DevelopmentConfig(Config):
 class ProductionConfig(Config):
     DEBUG = False
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
+
+    # Postgres connection pool tuning. The SQLAlchemy default pool of 5
+    # saturates under upload bursts and every overflow connect pays a
+    # TCP + auth handshake; pre-ping retires stale connections (serverless
+    # peers drop idle ones) without a request seeing the error, and the
+    # statement timeout keeps one slow query from pinning a pool slot.
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': 10,
+        'max_overflow': 20,
+        'pool_timeout': 5,
+        'pool_pre_ping': True,
+        'pool_recycle': 1800,
+        'connect_args': {'options': '-c statement_timeout=15000'},
+    }
     
     # Vercel/Serverless specific settings
     SESSION_COOKIE_SECURE = False  # Set to True if using HTTPS
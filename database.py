@@ -1,5 +1,8 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 
-db = SQLAlchemy()
-migrate = Migrate()
\ No newline at end of file
+# expire_on_commit=False keeps loaded instances (e.g. the authenticated
+# user fetched in login_required) usable after intermediate commits in
+# the same request instead of forcing a reload round-trip.
+db = SQLAlchemy(session_options={"expire_on_commit": False})
+migrate = Migrate()
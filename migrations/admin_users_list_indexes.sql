@@ -0,0 +1,13 @@
+-- Foreign-key indexes backing the per-user LATERAL aggregates in the
+-- admin users-list query; without these each page would still scan the
+-- full projects/exports tables per user.
+CREATE INDEX IF NOT EXISTS idx_projects_user_id ON projects (user_id);
+CREATE INDEX IF NOT EXISTS idx_exports_project_id ON exports (project_id);
+
+-- Partial index for the admin-access check: admins are a handful of
+-- rows, so the cache-miss lookup stays a single-page index scan
+CREATE INDEX IF NOT EXISTS idx_users_admin_email ON users (email) WHERE is_admin;
+
+-- Composite index matching the keyset pagination order
+-- (ORDER BY created_at DESC, id DESC with a (created_at, id) seek)
+CREATE INDEX IF NOT EXISTS idx_users_created_at_id ON users (created_at DESC, id DESC);
@@ -0,0 +1,7 @@
+-- Composite index serving the dashboard's combined filter
+-- (created_at >= today AND processing_status = ...) with a single
+-- index-only scan; the existing single-column BRIN/btree indexes from
+-- admin_quick_stats_mv.sql each cover only one side of that predicate.
+-- Run with CONCURRENTLY when applying to a live database.
+CREATE INDEX IF NOT EXISTS idx_whiteboards_created_status
+    ON whiteboards (created_at, processing_status);
@@ -0,0 +1,6 @@
+-- Covering index for the project exports listing
+-- (WHERE project_id = ? ORDER BY created_at DESC): the ordered scan
+-- comes straight off the index instead of sorting after a lookup on
+-- the single-column idx_exports_project_id.
+CREATE INDEX IF NOT EXISTS idx_exports_project_created
+    ON exports (project_id, created_at DESC);
@@ -0,0 +1,10 @@
+-- Trigram index for the admin users-list search box. The search terms
+-- arrive as substring matches ('%term%'), which a btree can never
+-- serve; a pg_trgm GIN index over the concatenated searchable columns
+-- answers leading-wildcard ILIKE with an index scan instead of a
+-- sequential scan per keystroke. The query must ILIKE against this
+-- exact expression for the planner to use the index.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_users_search_trgm ON users
+    USING gin ((username || ' ' || email || ' ' || COALESCE(display_name, '')) gin_trgm_ops);
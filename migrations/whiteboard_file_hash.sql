@@ -0,0 +1,8 @@
+-- SHA-256 of each uploaded original, indexed for the dedup lookup in
+-- upload_image: a re-uploaded byte-identical image reuses the stored
+-- original and enhanced files instead of saving and enhancing again.
+-- Not unique — the same image may legitimately appear in several
+-- projects; duplicates share files, they aren't rejected.
+ALTER TABLE whiteboards ADD COLUMN IF NOT EXISTS file_hash VARCHAR(64);
+CREATE INDEX IF NOT EXISTS idx_whiteboards_file_hash
+    ON whiteboards (file_hash);
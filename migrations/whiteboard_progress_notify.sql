@@ -0,0 +1,23 @@
+-- NOTIFY on committed whiteboard status transitions. Each worker runs
+-- one LISTEN wb_progress connection (models/whiteboard.py) and wakes
+-- its local SSE waiters, so a stream served by a different worker than
+-- the one running the analysis still sees the terminal transition
+-- without polling. Intermediate in-memory progress steps are notified
+-- directly from the application and don't pass through this trigger.
+
+CREATE OR REPLACE FUNCTION notify_whiteboard_progress()
+RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify(
+        'wb_progress',
+        NEW.id || ':' || COALESCE(NEW.processing_progress, 0)
+    );
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_whiteboards_progress_notify ON whiteboards;
+CREATE TRIGGER trg_whiteboards_progress_notify
+    AFTER UPDATE OF processing_status, processing_progress ON whiteboards
+    FOR EACH ROW
+    EXECUTE FUNCTION notify_whiteboard_progress();
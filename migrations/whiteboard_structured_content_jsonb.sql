@@ -0,0 +1,8 @@
+-- Store structured_content as JSONB instead of a TEXT blob of JSON.
+-- The driver then decodes the document once at the boundary rather
+-- than the app dumping on write and loading on every read, and
+-- server-side JSON queries become possible later. No GIN index yet:
+-- nothing queries into the document today.
+ALTER TABLE whiteboards
+    ALTER COLUMN structured_content TYPE JSONB
+    USING structured_content::jsonb;
@@ -0,0 +1,8 @@
+-- Compress large whiteboard text values with LZ4 instead of the
+-- default pglz (Postgres 14+). OCR output runs tens to hundreds of KB
+-- per row; LZ4 decompresses several times faster, which shows up
+-- directly in get_content and export reads that pull these columns out
+-- of TOAST. Applies to newly written values; existing rows keep pglz
+-- until rewritten.
+ALTER TABLE whiteboards ALTER COLUMN raw_text SET COMPRESSION lz4;
+ALTER TABLE whiteboards ALTER COLUMN structured_content SET COMPRESSION lz4;
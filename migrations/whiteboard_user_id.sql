@@ -0,0 +1,15 @@
+-- Denormalized owner column on whiteboards. User-scoped queries (the
+-- whiteboard branch of /search) previously joined projects just to
+-- filter by user_id, forcing the join to run before the LIMIT; with
+-- the owner on the row the filter is a single-table index seek.
+-- New rows get user_id at insert; this backfills the existing ones.
+ALTER TABLE whiteboards ADD COLUMN IF NOT EXISTS user_id VARCHAR(36) REFERENCES users(id);
+
+UPDATE whiteboards
+SET user_id = projects.user_id
+FROM projects
+WHERE whiteboards.project_id = projects.id
+  AND whiteboards.user_id IS NULL;
+
+CREATE INDEX IF NOT EXISTS ix_whiteboards_user_id
+    ON whiteboards (user_id);
@@ -0,0 +1,16 @@
+-- Composite indexes matching the workspace list queries' filter+order,
+-- so the planner walks the index in order and stops at the LIMIT
+-- instead of filtering then sorting.
+--
+-- list_projects and the dashboard's recent-projects list:
+--   WHERE user_id = ? ORDER BY updated_at DESC
+CREATE INDEX IF NOT EXISTS idx_projects_user_updated
+    ON projects (user_id, updated_at DESC);
+
+-- get_project's whiteboard listing and the per-project activity
+-- aggregates: WHERE project_id = ? ORDER BY created_at DESC
+CREATE INDEX IF NOT EXISTS idx_whiteboards_project_created
+    ON whiteboards (project_id, created_at DESC);
+
+-- exports (project_id, created_at DESC) already exists as
+-- idx_exports_project_created in export_list_index.sql.
@@ -0,0 +1,14 @@
+-- Full-text indexes for the workspace search endpoint. The previous
+-- LIKE '%q%' filters scanned every row; these GIN expression indexes
+-- let `to_tsvector(...) @@ plainto_tsquery(:q)` resolve from the index.
+-- The expressions must stay byte-identical to the ones built in
+-- api/workspace.py:search_projects or the planner won't match them.
+CREATE INDEX IF NOT EXISTS idx_projects_fts
+    ON projects USING GIN (
+        to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))
+    );
+
+CREATE INDEX IF NOT EXISTS idx_whiteboards_fts
+    ON whiteboards USING GIN (
+        to_tsvector('english', coalesce(raw_text, '') || ' ' || coalesce(structured_content::text, ''))
+    );
@@ -16,9 +16,22 @@ class Project(db.Model):
     
     # Relationships
     whiteboards = db.relationship('Whiteboard', backref='project', lazy=True, cascade='all, delete-orphan')
-    exports = db.relationship('Export', backref='project', lazy=True, cascade='all, delete-orphan')
+    exports = db.relationship('Export', backref='project', lazy=True, cascade='all, delete-orphan',
+                              order_by='Export.created_at.desc()')
     
     def to_dict(self):
+        # Counts come from one two-subquery SELECT: len(relationship)
+        # lazily loaded every whiteboard row (raw_text and
+        # structured_content included) and every export just to count
+        # them
+        from models.whiteboard import Whiteboard
+        from models.export import Export
+        wb_count, exp_count = db.session.execute(db.select(
+            db.select(db.func.count()).select_from(Whiteboard)
+                .where(Whiteboard.project_id == self.id).scalar_subquery(),
+            db.select(db.func.count()).select_from(Export)
+                .where(Export.project_id == self.id).scalar_subquery(),
+        )).one()
         return {
             'id': self.id,
             'title': self.title,
@@ -26,8 +39,8 @@ class Project(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'status': self.status,
-            'whiteboard_count': len(self.whiteboards),
-            'export_count': len(self.exports),
+            'whiteboard_count': wb_count,
+            'export_count': exp_count,
             'share_token': self.share_token
         }
     
@@ -38,4 +51,18 @@ class Project(db.Model):
     
     @classmethod
     def find_by_share_token(cls, token):
-        return cls.query.filter_by(share_token=token).first()
\ No newline at end of file
+        return cls.query.filter_by(share_token=token).first()
+
+    @classmethod
+    def owned_by(cls, project_id, user_id, *options):
+        """Fetch a project only if it belongs to the given user.
+
+        One query scoped by (id, user_id) replaces the fetch-then-compare
+        pattern, and callers answer a uniform 404 that doesn't reveal
+        whether someone else's project id exists. Loader options (e.g.
+        selectinload) pass through to the query.
+        """
+        query = cls.query.filter_by(id=project_id, user_id=user_id)
+        if options:
+            query = query.options(*options)
+        return query.first()
\ No newline at end of file
@@ -61,7 +61,7 @@ class User(db.Model):
             return True
         
         # Check if user has active subscription
-        if self.subscription_expires_at and self.subscription_expires_at > datetime.now(timezone.utc)():
+        if self.subscription_expires_at and self.subscription_expires_at > datetime.now(timezone.utc):
             return True
             
         # Check if user has custom API key
@@ -71,19 +71,31 @@ class User(db.Model):
         # Check free uses (10 free uses for new users)
         return self.free_uses_count < 10
     
-    def increment_usage(self, metric):
-        """Increment usage counters"""
-        if metric == 'projects':
-            self.projects_created += 1
-        elif metric == 'images':
-            self.images_processed += 1
-        elif metric == 'exports':
-            self.exports_generated += 1
-        
+    _USAGE_COLUMNS = {
+        'projects': 'projects_created',
+        'images': 'images_processed',
+        'exports': 'exports_generated',
+    }
+
+    def increment_usage(self, metric, count=1):
+        """Increment usage counters atomically.
+
+        Server-side `col = col + n` expressions make the bump one UPDATE
+        with no read-modify-write window, so concurrent uploads by the
+        same user can't lose increments the way loading the value into
+        Python and adding to it could.
+        """
+        column = self._USAGE_COLUMNS.get(metric)
+        values = {}
+        if column is not None:
+            values[column] = getattr(User, column) + count
+
         # Increment free uses if not subscribed and no custom API
-        if (not self.subscription_expires_at or self.subscription_expires_at <= datetime.now(timezone.utc)()) and not self.custom_api_key:
-            self.free_uses_count += 1
-            
+        if (not self.subscription_expires_at or self.subscription_expires_at <= datetime.now(timezone.utc)) and not self.custom_api_key:
+            values['free_uses_count'] = User.free_uses_count + count
+
+        if values:
+            User.query.filter_by(id=self.id).update(values)
         db.session.commit()
     
     def to_dict(self):
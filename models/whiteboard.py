@@ -1,18 +1,145 @@
 from datetime import datetime, timezone
 from database import db
+from sqlalchemy.dialects.postgresql import JSONB
+import os
+import select as select_mod
+import threading
+import time
 import uuid
-import json
+
+try:
+    import psycopg2
+except ImportError:  # SQLite dev setups don't install psycopg2
+    psycopg2 = None
+
+# In-process progress signals, one Condition per whiteboard id. SSE
+# streams wait on these instead of polling the database every second;
+# update_processing_status notifies after each committed transition.
+_progress_conditions = {}
+_progress_conditions_lock = threading.Lock()
+
+def progress_condition(whiteboard_id):
+    """Condition signalled whenever the whiteboard's status changes."""
+    _start_progress_listener()
+    with _progress_conditions_lock:
+        cond = _progress_conditions.get(whiteboard_id)
+        if cond is None:
+            cond = _progress_conditions[whiteboard_id] = threading.Condition()
+        return cond
+
+def _notify_progress(whiteboard_id, terminal):
+    cond = progress_condition(whiteboard_id)
+    with cond:
+        cond.notify_all()
+    if terminal:
+        # Waiters hold their own reference; dropping the dict entry
+        # just stops the registry growing with finished whiteboards
+        with _progress_conditions_lock:
+            _progress_conditions.pop(whiteboard_id, None)
+        _live_progress.pop(whiteboard_id, None)
+
+# Intermediate progress values live in memory only: committing every
+# 25% step cost four fsyncs per analysis for state nobody needs to
+# survive a restart. Postgres sees just the initial 'processing' and
+# the terminal 'completed'/'error' transitions.
+_live_progress = {}
+
+def set_live_progress(whiteboard_id, progress):
+    """Publish an intermediate progress value and wake SSE waiters."""
+    _live_progress[whiteboard_id] = progress
+    cond = progress_condition(whiteboard_id)
+    with cond:
+        cond.notify_all()
+    _emit_progress_notify(whiteboard_id, progress)
+
+def get_live_progress(whiteboard_id, default=0):
+    return _live_progress.get(whiteboard_id, default)
+
+# Cross-worker delivery: a Condition only wakes waiters in the process
+# that runs the analysis, but an SSE client may be connected to another
+# gunicorn worker. On Postgres a NOTIFY on 'wb_progress' (emitted here
+# for in-memory steps and by the trigger in
+# migrations/whiteboard_progress_notify.sql for committed transitions)
+# fans the update out, and every worker runs one LISTEN connection that
+# feeds its local conditions. Same shape as the admin cache listener.
+_notify_conn = None
+_notify_conn_lock = threading.Lock()
+_progress_listener_started = False
+_progress_listener_lock = threading.Lock()
+
+def _emit_progress_notify(whiteboard_id, progress):
+    global _notify_conn
+    dsn = os.environ.get('DATABASE_URL')
+    if psycopg2 is None or not dsn:
+        return
+    with _notify_conn_lock:
+        try:
+            if _notify_conn is None or _notify_conn.closed:
+                _notify_conn = psycopg2.connect(dsn)
+                _notify_conn.set_isolation_level(
+                    psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT
+                )
+            with _notify_conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT pg_notify('wb_progress', %s)",
+                    (f"{whiteboard_id}:{progress}",),
+                )
+        except Exception:
+            _notify_conn = None
+
+def _progress_listener():
+    """Background LISTEN loop feeding local progress conditions."""
+    while True:
+        try:
+            conn = psycopg2.connect(os.environ.get('DATABASE_URL'))
+            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            with conn.cursor() as cursor:
+                cursor.execute("LISTEN wb_progress")
+            while True:
+                if select_mod.select([conn], [], [], 60) != ([], [], []):
+                    conn.poll()
+                    while conn.notifies:
+                        note = conn.notifies.pop(0)
+                        whiteboard_id, _, progress = note.payload.partition(':')
+                        if progress.isdigit():
+                            _live_progress[whiteboard_id] = int(progress)
+                        cond = _progress_conditions.get(whiteboard_id)
+                        if cond is not None:
+                            with cond:
+                                cond.notify_all()
+        except Exception as e:
+            print(f"Whiteboard progress listener error: {e}")
+            time.sleep(5)
+
+def _start_progress_listener():
+    """Start the LISTEN thread once per worker process"""
+    global _progress_listener_started
+    if psycopg2 is None or not os.environ.get('DATABASE_URL'):
+        return
+    if _progress_listener_started:
+        return
+    with _progress_listener_lock:
+        if not _progress_listener_started:
+            threading.Thread(target=_progress_listener, daemon=True).start()
+            _progress_listener_started = True
 
 class Whiteboard(db.Model):
     __tablename__ = 'whiteboards'
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     project_id = db.Column(db.String(36), db.ForeignKey('projects.id'), nullable=False)
+    # Denormalized from the owning project so user-scoped queries (the
+    # whiteboard branch of /search) filter this table directly instead
+    # of joining projects; backfilled by whiteboard_user_id.sql
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=True, index=True)
     filename = db.Column(db.String(255), nullable=False)
     original_path = db.Column(db.String(500), nullable=False)
     processed_path = db.Column(db.String(500), nullable=True)
     file_size = db.Column(db.Integer, nullable=False)
     mime_type = db.Column(db.String(100), nullable=False)
+    # SHA-256 of the original upload; indexed so re-uploads of the same
+    # image can reuse the already-enhanced file instead of reprocessing
+    file_hash = db.Column(db.String(64), nullable=True, index=True)
     
     # Processing status
     processing_status = db.Column(db.String(20), default='uploaded')  # uploaded, processing, completed, error
@@ -21,7 +148,12 @@ class Whiteboard(db.Model):
     
     # Extracted content
     raw_text = db.Column(db.Text, nullable=True)
-    structured_content = db.Column(db.Text, nullable=True)  # JSON string
+    # Native JSON column (JSONB on Postgres): the driver handles
+    # encode/decode once at the boundary, so the app never re-dumps or
+    # re-parses the document between storage and response
+    structured_content = db.Column(
+        db.JSON().with_variant(JSONB, 'postgresql'), nullable=True
+    )
     confidence_score = db.Column(db.Float, nullable=True)
     
     # Metadata
@@ -29,13 +161,6 @@ class Whiteboard(db.Model):
     processed_at = db.Column(db.DateTime, nullable=True)
     
     def to_dict(self):
-        structured = None
-        if self.structured_content:
-            try:
-                structured = json.loads(self.structured_content)
-            except json.JSONDecodeError:
-                structured = None
-        
         return {
             'id': self.id,
             'project_id': self.project_id,
@@ -46,22 +171,40 @@ class Whiteboard(db.Model):
             'processing_progress': self.processing_progress,
             'error_message': self.error_message,
             'raw_text': self.raw_text,
-            'structured_content': structured,
+            'structured_content': self.structured_content,
             'confidence_score': self.confidence_score,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'processed_at': self.processed_at.isoformat() if self.processed_at else None
         }
     
+    def to_summary_dict(self):
+        """Listing payload: everything but the heavy content columns.
+
+        raw_text and structured_content can run to hundreds of KB per
+        row; list views only need the metadata, and callers pair this
+        with defer() so the database never ships those columns either.
+        """
+        return {
+            'id': self.id,
+            'project_id': self.project_id,
+            'filename': self.filename,
+            'file_size': self.file_size,
+            'mime_type': self.mime_type,
+            'processing_status': self.processing_status,
+            'processing_progress': self.processing_progress,
+            'error_message': self.error_message,
+            'confidence_score': self.confidence_score,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'processed_at': self.processed_at.isoformat() if self.processed_at else None
+        }
+
+    # Kept as passthroughs for existing callers; the JSON column type
+    # made the dumps/loads round trip they used to do redundant
     def set_structured_content(self, content_dict):
-        self.structured_content = json.dumps(content_dict, ensure_ascii=False, indent=2)
-    
+        self.structured_content = content_dict
+
     def get_structured_content(self):
-        if self.structured_content:
-            try:
-                return json.loads(self.structured_content)
-            except json.JSONDecodeError:
-                return None
-        return None
+        return self.structured_content
     
     def update_processing_status(self, status, progress=None, error_message=None):
         self.processing_status = status
@@ -71,4 +214,5 @@ class Whiteboard(db.Model):
             self.error_message = error_message
         if status == 'completed':
             self.processed_at = datetime.now(timezone.utc)
-        db.session.commit()
\ No newline at end of file
+        db.session.commit()
+        _notify_progress(self.id, terminal=status in ('completed', 'error'))
\ No newline at end of file
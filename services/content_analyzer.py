@@ -1,23 +1,56 @@
+import functools
 import re
 import json
 from typing import Dict, List, Any, Tuple
 from collections import defaultdict
 
 class ContentAnalyzer:
+    # Patterns and keyword tables are built once at import: the per-task
+    # helpers run for every extracted todo, and recompiling regexes or
+    # rebuilding the lists inside each call was pure overhead
+    TODO_PATTERNS = [re.compile(p, re.MULTILINE | re.IGNORECASE) for p in (
+        r'(?:TODO|To-?do|ACTION|Action|TASK|Task):\s*(.+)',
+        r'[-*•]\s*\[?\s*\]?\s*(.+)',
+        r'(?:\d+\.|\w\))\s*(.+)',
+        r'→\s*(.+)',  # Arrow indicators
+        r'⭐\s*(.+)',  # Star indicators
+    )]
+
+    PRIORITY_KEYWORDS = {
+        'high': ['urgent', 'asap', 'critical', 'important', 'priority', 'deadline'],
+        'medium': ['soon', 'next week', 'follow up', 'check', 'review'],
+        'low': ['later', 'eventually', 'consider', 'maybe', 'optional']
+    }
+
+    ASSIGNEE_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+        r'@([A-Za-z]+)',
+        r'assigned to ([A-Za-z]+)',
+        r'([A-Za-z]+) will',
+        r'([A-Za-z]+) should',
+        r'([A-Za-z]+) needs to'
+    )]
+
+    DEADLINE_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+        r'by ([A-Za-z]+ \d+)',
+        r'due ([A-Za-z]+ \d+)',
+        r'deadline ([A-Za-z]+ \d+)',
+        r'(next week|this week|tomorrow|today)',
+        r'(\d+/\d+/\d+)',
+        r'(\d+-\d+-\d+)'
+    )]
+
+    TASK_CATEGORIES = {
+        'development': ['code', 'develop', 'build', 'implement', 'program', 'debug'],
+        'research': ['research', 'investigate', 'study', 'analyze', 'explore'],
+        'communication': ['email', 'call', 'meeting', 'discuss', 'contact', 'inform'],
+        'documentation': ['document', 'write', 'update', 'record', 'note'],
+        'testing': ['test', 'verify', 'validate', 'check', 'review'],
+        'planning': ['plan', 'schedule', 'organize', 'prepare', 'setup']
+    }
+
     def __init__(self):
-        self.todo_patterns = [
-            r'(?:TODO|To-?do|ACTION|Action|TASK|Task):\s*(.+)',
-            r'[-*•]\s*\[?\s*\]?\s*(.+)',
-            r'(?:\d+\.|\w\))\s*(.+)',
-            r'→\s*(.+)',  # Arrow indicators
-            r'⭐\s*(.+)',  # Star indicators
-        ]
-        
-        self.priority_keywords = {
-            'high': ['urgent', 'asap', 'critical', 'important', 'priority', 'deadline'],
-            'medium': ['soon', 'next week', 'follow up', 'check', 'review'],
-            'low': ['later', 'eventually', 'consider', 'maybe', 'optional']
-        }
+        self.todo_patterns = self.TODO_PATTERNS
+        self.priority_keywords = self.PRIORITY_KEYWORDS
     
     def structure_content(self, raw_analysis: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -93,7 +126,7 @@ class ContentAnalyzer:
         todos = []
         
         for pattern in self.todo_patterns:
-            matches = re.finditer(pattern, text, re.MULTILINE | re.IGNORECASE)
+            matches = pattern.finditer(text)
             for match in matches:
                 task_text = match.group(1).strip()
                 if len(task_text) > 5:  # Filter out very short matches
@@ -258,16 +291,8 @@ class ContentAnalyzer:
         Extract assignee from task text
         """
         # Look for patterns like "@John", "assigned to John", "John will"
-        assignee_patterns = [
-            r'@([A-Za-z]+)',
-            r'assigned to ([A-Za-z]+)',
-            r'([A-Za-z]+) will',
-            r'([A-Za-z]+) should',
-            r'([A-Za-z]+) needs to'
-        ]
-        
-        for pattern in assignee_patterns:
-            match = re.search(pattern, task_text, re.IGNORECASE)
+        for pattern in self.ASSIGNEE_PATTERNS:
+            match = pattern.search(task_text)
             if match:
                 return match.group(1).title()
         
@@ -277,17 +302,8 @@ class ContentAnalyzer:
         """
         Extract deadline information from task text
         """
-        deadline_patterns = [
-            r'by ([A-Za-z]+ \d+)',
-            r'due ([A-Za-z]+ \d+)',
-            r'deadline ([A-Za-z]+ \d+)',
-            r'(next week|this week|tomorrow|today)',
-            r'(\d+/\d+/\d+)',
-            r'(\d+-\d+-\d+)'
-        ]
-        
-        for pattern in deadline_patterns:
-            match = re.search(pattern, task_text, re.IGNORECASE)
+        for pattern in self.DEADLINE_PATTERNS:
+            match = pattern.search(task_text)
             if match:
                 return match.group(1)
         
@@ -297,18 +313,9 @@ class ContentAnalyzer:
         """
         Categorize task based on content
         """
-        categories = {
-            'development': ['code', 'develop', 'build', 'implement', 'program', 'debug'],
-            'research': ['research', 'investigate', 'study', 'analyze', 'explore'],
-            'communication': ['email', 'call', 'meeting', 'discuss', 'contact', 'inform'],
-            'documentation': ['document', 'write', 'update', 'record', 'note'],
-            'testing': ['test', 'verify', 'validate', 'check', 'review'],
-            'planning': ['plan', 'schedule', 'organize', 'prepare', 'setup']
-        }
-        
         task_lower = task_text.lower()
         
-        for category, keywords in categories.items():
+        for category, keywords in self.TASK_CATEGORIES.items():
             if any(keyword in task_lower for keyword in keywords):
                 return category
         
@@ -504,4 +511,9 @@ class ContentAnalyzer:
         action_items = content.get('action_items', [])
         high_priority_items = [item['task'] for item in action_items if item.get('priority') == 'high']
         
-        return high_priority_items[:3]  # Top 3 next steps
\ No newline at end of file
+        return high_priority_items[:3]  # Top 3 next steps
+
+@functools.lru_cache(maxsize=1)
+def get_content_analyzer() -> "ContentAnalyzer":
+    """Process-wide ContentAnalyzer; the instance is stateless."""
+    return ContentAnalyzer()
@@ -1,3 +1,4 @@
+import functools
 import os
 import json
 import requests
@@ -11,6 +12,15 @@ class DoubaoService:
         self.api_key = Config.DOUBAO_API_KEY
         self.endpoint = Config.DOUBAO_ENDPOINT
         self.model_id = Config.DOUBAO_MODEL_ID
+        # One Session per service instance: keep-alive reuses the TLS
+        # connection to the Doubao endpoint across calls instead of
+        # paying a handshake per request. Analyses run on background
+        # threads, so the pool is sized above the default of 10 to keep
+        # concurrent jobs from discarding each other's connections.
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=20)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         
         # Don't fail if API key is missing - just disable the service
         if not self.api_key:
@@ -119,7 +129,7 @@ Be thorough and accurate. Include all visible text and structural elements."""
         }
         
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=60)
+            response = self.session.post(url, json=payload, headers=headers, timeout=60)
             if response.status_code == 200:
                 result = response.json()
                 content = result['choices'][0]['message']['content']
@@ -195,7 +205,7 @@ Maintain the original JSON structure but improve the content quality."""
         }
         
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=30)
+            response = self.session.post(url, json=payload, headers=headers, timeout=30)
             if response.status_code == 200:
                 result = response.json()
                 content = result['choices'][0]['message']['content']
@@ -249,7 +259,7 @@ Maintain the original JSON structure but improve the content quality."""
         }
         
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=30)
+            response = self.session.post(url, json=payload, headers=headers, timeout=30)
             if response.status_code == 200:
                 result = response.json()
                 return result['choices'][0]['message']['content']
@@ -309,4 +319,9 @@ Maintain the original JSON structure but improve the content quality."""
         except Exception as e:
             # If conversion fails, return original data
             print(f"PNG to JPEG conversion failed: {e}")
-            return image_base64, 'image/jpeg'  # Try with JPEG mime type anyway
\ No newline at end of file
+            return image_base64, 'image/jpeg'  # Try with JPEG mime type anyway
+
+@functools.lru_cache(maxsize=1)
+def get_doubao_service() -> "DoubaoService":
+    """Process-wide DoubaoService, so the HTTP session persists."""
+    return DoubaoService()
@@ -1,3 +1,4 @@
+import functools
 import os
 import json
 import markdown
@@ -19,7 +20,7 @@ class ExportService:
             # In serverless environments, directories will be created on demand
             pass
     
-    def to_markdown(self, project, options: Dict[str, Any] = None) -> Tuple[str, str]:
+    def to_markdown(self, project, options: Dict[str, Any] = None) -> Tuple[str, str, int]:
         """
         Generate Markdown export from project data
         """
@@ -44,16 +45,18 @@ class ExportService:
             # Generate markdown content
             md_content = self._generate_markdown_content(all_content, project, options)
             
-            # Write to file
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(md_content)
+            # Write to file; the encoded length is the file size, so
+            # callers don't need a follow-up stat
+            data = md_content.encode('utf-8')
+            with open(file_path, 'wb') as f:
+                f.write(data)
             
-            return file_path, filename
+            return file_path, filename, len(data)
         
         except Exception as e:
             raise Exception(f"Markdown export failed: {str(e)}")
     
-    def to_pptx(self, project, options: Dict[str, Any] = None) -> Tuple[str, str]:
+    def to_pptx(self, project, options: Dict[str, Any] = None) -> Tuple[str, str, int]:
         """
         Generate PowerPoint presentation from project data
         """
@@ -82,12 +85,12 @@ class ExportService:
             # Save presentation
             prs.save(file_path)
             
-            return file_path, filename
+            return file_path, filename, os.path.getsize(file_path)
         
         except Exception as e:
             raise Exception(f"PowerPoint export failed: {str(e)}")
     
-    def to_mindmap(self, project, options: Dict[str, Any] = None) -> Tuple[str, str]:
+    def to_mindmap(self, project, options: Dict[str, Any] = None) -> Tuple[str, str, int]:
         """
         Generate mind map data from project content
         """
@@ -115,25 +118,25 @@ class ExportService:
             
             # Export in requested format
             if format_type == 'json':
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(mindmap_data, f, indent=2, ensure_ascii=False)
+                data = json.dumps(mindmap_data, indent=2, ensure_ascii=False).encode('utf-8')
             elif format_type == 'xmind':
                 # For demo, we'll save as JSON with xmind structure
                 xmind_data = self._convert_to_xmind_format(mindmap_data)
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(xmind_data, f, indent=2, ensure_ascii=False)
+                data = json.dumps(xmind_data, indent=2, ensure_ascii=False).encode('utf-8')
             elif format_type == 'freemind':
                 # For demo, we'll save as XML structure
-                freemind_xml = self._convert_to_freemind_format(mindmap_data)
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(freemind_xml)
+                data = self._convert_to_freemind_format(mindmap_data).encode('utf-8')
+            else:
+                data = b''
+            with open(file_path, 'wb') as f:
+                f.write(data)
             
-            return file_path, filename
+            return file_path, filename, len(data)
         
         except Exception as e:
             raise Exception(f"Mind map export failed: {str(e)}")
     
-    def to_notion(self, project, options: Dict[str, Any] = None) -> Tuple[str, str]:
+    def to_notion(self, project, options: Dict[str, Any] = None) -> Tuple[str, str, int]:
         """
         Generate Notion-compatible export
         """
@@ -158,15 +161,16 @@ class ExportService:
             # Generate Notion-specific markdown
             notion_content = self._generate_notion_content(all_content, project, options)
             
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(notion_content)
+            data = notion_content.encode('utf-8')
+            with open(file_path, 'wb') as f:
+                f.write(data)
             
-            return file_path, filename
+            return file_path, filename, len(data)
         
         except Exception as e:
             raise Exception(f"Notion export failed: {str(e)}")
     
-    def to_confluence(self, project, options: Dict[str, Any] = None) -> Tuple[str, str]:
+    def to_confluence(self, project, options: Dict[str, Any] = None) -> Tuple[str, str, int]:
         """
         Generate Confluence wiki format export
         """
@@ -191,10 +195,11 @@ class ExportService:
             # Generate Confluence markup
             confluence_content = self._generate_confluence_content(all_content, project, options)
             
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(confluence_content)
+            data = confluence_content.encode('utf-8')
+            with open(file_path, 'wb') as f:
+                f.write(data)
             
-            return file_path, filename
+            return file_path, filename, len(data)
         
         except Exception as e:
             raise Exception(f"Confluence export failed: {str(e)}")
@@ -623,4 +628,9 @@ class ExportService:
                 lines.append("{note}")
                 lines.append("")
         
-        return "\n".join(lines)
\ No newline at end of file
+        return "\n".join(lines)
+
+@functools.lru_cache(maxsize=1)
+def get_export_service() -> "ExportService":
+    """Process-wide ExportService; avoids re-checking the export dir."""
+    return ExportService()
@@ -1,3 +1,4 @@
+import functools
 from PIL import Image, ImageEnhance, ImageFilter, ExifTags
 import os
 from typing import Optional
@@ -119,4 +120,9 @@ class ImageProcessor:
             'text_regions': [],
             'diagram_regions': [],
             'table_regions': []
-        }
\ No newline at end of file
+        }
+
+@functools.lru_cache(maxsize=1)
+def get_image_processor() -> "ImageProcessor":
+    """Process-wide ImageProcessor; the instance is stateless."""
+    return ImageProcessor()
@@ -1,3 +1,4 @@
+import functools
 import os
 import shutil
 from typing import Optional
@@ -71,12 +72,31 @@ class StorageService:
         
         # Create full file path
         file_path = os.path.join(save_directory, filename)
-        
-        # Save the file
-        file.save(file_path)
-        
+
+        # Save the file; a 1 MB buffer halves the syscall count on large
+        # images versus werkzeug's 16 KB default
+        file.save(file_path, buffer_size=1024 * 1024)
+
         return file_path
     
+    def release_page_cache(self, file_path: str) -> None:
+        """Hint the kernel that a local file won't be re-read soon.
+
+        POSIX_FADV_DONTNEED drops the file's clean pages from the page
+        cache, so a run of large uploads doesn't evict hotter data.
+        Local storage only, and a no-op on platforms without fadvise.
+        """
+        if self.storage_type != 'local' or not hasattr(os, 'posix_fadvise'):
+            return
+        try:
+            fd = os.open(file_path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+        except OSError:
+            pass
+
     def _save_s3(self, file: FileStorage, filename: str, subfolder: str) -> str:
         """
         Save file to S3
@@ -314,4 +334,9 @@ class StorageService:
         except Exception as e:
             print(f"Cleanup failed: {e}")
         
-        return deleted_count
\ No newline at end of file
+        return deleted_count
+
+@functools.lru_cache(maxsize=1)
+def get_storage_service() -> "StorageService":
+    """Process-wide StorageService, so the S3 client is reused."""
+    return StorageService()
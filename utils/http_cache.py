@@ -0,0 +1,50 @@
+"""Precompressed frozen JSON payloads for static endpoints.
+
+Endpoints like the export formats catalogue and the statistics health
+check return bytes that never change at runtime. Compressing them once
+at import time and answering with a stable ETag plus a public
+Cache-Control lets proxies and CDNs absorb repeat GETs entirely, and
+clients that do reach the origin get the small precompressed body
+instead of the full payload.
+"""
+import gzip
+import hashlib
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip covers remaining clients
+    brotli = None
+
+
+class FrozenJSON:
+    """A constant JSON body with gzip/brotli variants built once."""
+
+    def __init__(self, body, cache_control='public, max-age=300'):
+        self.body = body
+        # mtime=0 keeps the gzip bytes (and thus any downstream cache
+        # keys) identical across restarts
+        self.gzip_body = gzip.compress(body, mtime=0)
+        self.br_body = brotli.compress(body, quality=11) if brotli else None
+        self.etag = hashlib.blake2b(body, digest_size=8).hexdigest()
+        self.cache_control = cache_control
+
+    def response(self):
+        headers = {
+            'ETag': f'"{self.etag}"',
+            'Cache-Control': self.cache_control,
+            'Vary': 'Accept-Encoding',
+        }
+        if self.etag in request.if_none_match:
+            return Response(status=304, headers=headers)
+
+        accepted = request.accept_encodings
+        if self.br_body is not None and accepted.quality('br') > 0:
+            headers['Content-Encoding'] = 'br'
+            data = self.br_body
+        elif accepted.quality('gzip') > 0:
+            headers['Content-Encoding'] = 'gzip'
+            data = self.gzip_body
+        else:
+            data = self.body
+        return Response(data, mimetype='application/json', headers=headers)
@@ -0,0 +1,69 @@
+"""Shared Redis response cache with graceful degradation.
+
+A cache hit returns previously serialized JSON bytes, skipping both the
+queries and re-serialization behind the endpoint. Redis being down just
+means every request recomputes, same as having no cache; no endpoint
+ever fails because of it.
+"""
+import redis
+from config import Config
+
+_redis_client = None
+
+
+def get_redis():
+    global _redis_client
+    if _redis_client is None:
+        try:
+            _redis_client = redis.Redis.from_url(
+                Config.REDIS_URL, socket_connect_timeout=1, socket_timeout=1
+            )
+        except Exception as e:
+            print(f"Redis unavailable for response cache: {e}")
+            return None
+    return _redis_client
+
+
+def cache_get(key):
+    client = get_redis()
+    if client is None:
+        return None
+    try:
+        return client.get(key)
+    except Exception:
+        return None
+
+
+def cache_set(key, payload, ttl=60):
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        client.setex(key, ttl, payload)
+    except Exception:
+        pass
+
+
+def cache_delete(key):
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        client.delete(key)
+    except Exception:
+        pass
+
+
+def cache_delete_pattern(pattern):
+    """Delete every key matching a glob pattern (e.g. paginated
+    variants of one user's list). SCAN-based, so it doesn't block the
+    server the way KEYS would."""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        keys = list(client.scan_iter(pattern, count=100))
+        if keys:
+            client.delete(*keys)
+    except Exception:
+        pass